@@ -1,7 +1,8 @@
-import json
+from typing import List
 
 import redis
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 
 from feature_restriction.clients import (
     RedisStreamClient,
@@ -17,11 +18,12 @@ from feature_restriction.config import (
 )
 from feature_restriction.endpoint_access import RedisEndpointAccess
 from feature_restriction.models import Event
-from feature_restriction.publisher import RedisEventPublisher
-from feature_restriction.redis_user_manager import RedisUserManager
+from feature_restriction.publisher import EventPublisher, RedisEventPublisher
+from feature_restriction.redis_user_manager import RedisUserManager, UserManager
 from feature_restriction.utils import logger
 
-app = FastAPI()
+# orjson serializes every response instead of the stdlib json module
+app = FastAPI(default_response_class=ORJSONResponse)
 
 
 # Instantiate and connect to each Redis client
@@ -33,6 +35,24 @@ redis_client_user = RedisUserClient(REDIS_HOST, REDIS_PORT, REDIS_DB_USER).conne
 user_manager = RedisUserManager(redis_client_user)
 
 
+def get_event_publisher() -> EventPublisher:
+    """
+    Provide the event publisher used by the event endpoints.
+
+    Tests can replace it through `app.dependency_overrides`.
+    """
+    return RedisEventPublisher(redis_client_stream)
+
+
+def get_user_manager() -> UserManager:
+    """
+    Provide the user manager used by the access endpoints.
+
+    Tests can replace it through `app.dependency_overrides`.
+    """
+    return user_manager
+
+
 logger.info("*********************************")
 logger.info("*********************************")
 
@@ -69,8 +89,8 @@ async def startup_event():
         logger.info("Cleared Redis user database.")
 
         # Log the number of keys in each database after cleanup
-        stream_keys_count = len(redis_client_stream.keys("*"))
-        user_keys_count = len(redis_client_user.keys("*"))
+        stream_keys_count = redis_client_stream.dbsize()
+        user_keys_count = redis_client_user.dbsize()
         logger.info(f"Number of keys in Redis stream database: {stream_keys_count}")
         logger.info(f"Number of keys in Redis user database: {user_keys_count}")
 
@@ -84,7 +104,9 @@ async def startup_event():
 
 
 @app.post("/event")
-async def handle_event(event: Event):
+async def handle_event(
+    event: Event, publisher: EventPublisher = Depends(get_event_publisher)
+):
     """
     Add the incoming event to the Redis stream.
 
@@ -92,6 +114,8 @@ async def handle_event(event: Event):
     ----------
     event : Event
         The event data to be added to the Redis stream.
+    publisher : EventPublisher
+        The publisher writing to the Redis stream.
 
     Returns
     -------
@@ -103,12 +127,41 @@ async def handle_event(event: Event):
     HTTPException
         If there is an issue with adding the event to the stream.
     """
-    response = RedisEventPublisher(redis_client_stream).add_event_to_stream(event)
+    response = publisher.add_event_to_stream(event)
+    return response
+
+
+@app.post("/events:batch")
+async def handle_events_batch(
+    events: List[Event],
+    publisher: EventPublisher = Depends(get_event_publisher),
+):
+    """
+    Add a batch of incoming events to the Redis stream in a single round trip.
+
+    Parameters
+    ----------
+    events : List[Event]
+        The events to be added to the Redis stream, in order.
+    publisher : EventPublisher
+        The publisher writing to the Redis stream.
+
+    Returns
+    -------
+    dict
+        The response from the event publisher.
+
+    Raises
+    ------
+    HTTPException
+        If there is an issue with adding the events to the stream.
+    """
+    response = publisher.add_events_to_stream(events)
     return response
 
 
 @app.get("/canmessage")
-def can_message(user_id: str):
+def can_message(user_id: str, user_manager: UserManager = Depends(get_user_manager)):
     """
     Check if a user has access to send/receive messages.
 
@@ -116,6 +169,8 @@ def can_message(user_id: str):
     ----------
     user_id : str
         The ID of the user.
+    user_manager : UserManager
+        The manager used to look up the user.
 
     Returns
     -------
@@ -132,7 +187,7 @@ def can_message(user_id: str):
 
 
 @app.get("/canpurchase")
-def can_purchase(user_id: str):
+def can_purchase(user_id: str, user_manager: UserManager = Depends(get_user_manager)):
     """
     Check if a user has access to make purchases.
 
@@ -140,6 +195,8 @@ def can_purchase(user_id: str):
     ----------
     user_id : str
         The ID of the user.
+    user_manager : UserManager
+        The manager used to look up the user.
 
     Returns
     -------
@@ -155,6 +212,32 @@ def can_purchase(user_id: str):
     return endpoint_access.check_access(user_id, "can_purchase")
 
 
+@app.get("/access")
+def access(user_id: str, user_manager: UserManager = Depends(get_user_manager)):
+    """
+    Check all of a user's access flags with a single lookup.
+
+    Parameters
+    ----------
+    user_id : str
+        The ID of the user.
+    user_manager : UserManager
+        The manager used to look up the user.
+
+    Returns
+    -------
+    dict
+        The access status for messaging and purchasing.
+
+    Raises
+    ------
+    HTTPException
+        If there is an error checking access.
+    """
+    endpoint_access = RedisEndpointAccess(user_manager)
+    return endpoint_access.check_all_access(user_id)
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """
@@ -1,5 +1,7 @@
 import redis
 
+from feature_restriction.config import REDIS_MAX_CONNECTIONS
+
 
 class RedisConnectionBase:
     """Base class for Redis connections."""
@@ -12,14 +14,22 @@ class RedisConnectionBase:
         self.connection = None
 
     def connect(self):
-        """Establish a Redis connection."""
+        """
+        Establish a Redis connection.
+
+        The client is created once and draws on a bounded, blocking connection pool, so
+        every request reuses open connections instead of opening new ones, and bursts
+        wait for a free connection rather than failing.
+        """
         if not self.connection:
-            self.connection = redis.StrictRedis(
+            pool = redis.BlockingConnectionPool(
                 host=self.host,
                 port=self.port,
                 db=self.db,
                 decode_responses=self.decode_responses,
+                max_connections=REDIS_MAX_CONNECTIONS,
             )
+            self.connection = redis.StrictRedis(connection_pool=pool)
         return self.connection
 
 
@@ -8,10 +8,14 @@ load_dotenv()
 # Redis configuration
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = 6379
-REDIS_DB_USER = 0  # Default DB for user data
-REDIS_DB_STREAM = 1  # Separate DB for the stream
-REDIS_DB_TRIPWIRE = 2  # Separate DB for the tripwire data
+# Shifts the user/stream/tripwire DBs so parallel test workers get disjoint databases
+REDIS_DB_OFFSET = int(os.getenv("REDIS_DB_OFFSET", 0))
+REDIS_DB_USER = 0 + REDIS_DB_OFFSET  # Default DB for user data
+REDIS_DB_STREAM = 1 + REDIS_DB_OFFSET  # Separate DB for the stream
+REDIS_DB_TRIPWIRE = 2 + REDIS_DB_OFFSET  # Separate DB for the tripwire data
 REDIS_DB_LOCUST = 3  # Separate DB for Locust load test
+# Upper bound on open connections per Redis client; callers wait for a free one beyond it
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 64))
 
 # Stream configuration
 EVENT_STREAM_KEY = "event_stream"
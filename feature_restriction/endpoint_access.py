@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 
 from fastapi import HTTPException
 
+from feature_restriction.models import AccessFlag
 from feature_restriction.redis_user_manager import RedisUserManager, UserManager
 from feature_restriction.utils import logger
 
@@ -11,6 +12,10 @@ class EndpointAccess:
     def check_access(self, user_id: str, access_key: str) -> dict:
         """Check user access for a given feature or endpoint."""
 
+    @abstractmethod
+    def check_all_access(self, user_id: str) -> dict:
+        """Check user access for every feature in a single lookup."""
+
 
 class RedisEndpointAccess(EndpointAccess):
     """
@@ -28,6 +33,8 @@ class RedisEndpointAccess(EndpointAccess):
     -------
     check_access(user_id, access_key)
         Checks whether a user has access to a specific feature based on their access flags.
+    check_all_access(user_id)
+        Returns all of a user's access flags from a single user lookup.
     """
 
     def __init__(self, redis_user_manager: UserManager):
@@ -46,8 +53,8 @@ class RedisEndpointAccess(EndpointAccess):
         Check user access for a given feature or endpoint.
 
         This method retrieves the user's data from the Redis database using the
-        `RedisUserManager` and checks if the specified `access_key` exists in the
-        user's `access_flags`. If the user is not found or an unexpected error occurs,
+        `RedisUserManager` and checks whether the `AccessFlag` named by `access_key` is
+        set in the user's `access_flags`. If the user is not found or an unexpected error occurs,
         appropriate logging and error handling are performed.
 
         Parameters
@@ -63,6 +70,7 @@ class RedisEndpointAccess(EndpointAccess):
             A dictionary containing the access status for the specified key.
             For example:
             - If successful: {"can_message": True}
+            - If `access_key` is not a known flag: {"<access_key>": None}
             - If user not found: {"error": "No user found with ID '<user_id>'"}
             - On unexpected error: Raises HTTPException with a 500 status code.
 
@@ -78,7 +86,8 @@ class RedisEndpointAccess(EndpointAccess):
         """
         try:
             user_data = self.redis_user_manager.get_user(user_id)
-            reply = user_data.access_flags.get(access_key)
+            flag = AccessFlag.__members__.get(access_key)
+            reply = None if flag is None else flag in user_data.access_flags
             logger.info(f"User with ID '{user_id}' access '{access_key}': {reply}.")
             return {access_key: reply}
         except KeyError:
@@ -87,3 +96,39 @@ class RedisEndpointAccess(EndpointAccess):
         except Exception as e:
             logger.error(f"Unexpected error in '{access_key}' check: {e}")
             raise HTTPException(status_code=500, detail="An unexpected error occurred.")
+
+    def check_all_access(self, user_id: str) -> dict:
+        """
+        Check user access for every feature in a single lookup.
+
+        Parameters
+        ----------
+        user_id : str
+            The unique identifier of the user.
+
+        Returns
+        -------
+        dict
+            A dictionary containing every access flag of the user.
+            For example:
+            - If successful: {"can_message": True, "can_purchase": False}
+            - If user not found: {"error": "No user found with ID '<user_id>'"}
+            - On unexpected error: Raises HTTPException with a 500 status code.
+
+        Raises
+        ------
+        HTTPException
+            If an unexpected error occurs during the access check.
+        """
+        try:
+            user_data = self.redis_user_manager.get_user(user_id)
+            access_flags = user_data.access_flags
+            reply = {flag.name: flag in access_flags for flag in AccessFlag}
+            logger.info(f"User with ID '{user_id}' access: {reply}.")
+            return reply
+        except KeyError:
+            logger.error(f"User with ID '{user_id}' not found.")
+            return {"error": f"No user found with ID '{user_id}'"}
+        except Exception as e:
+            logger.error(f"Unexpected error in access check: {e}")
+            raise HTTPException(status_code=500, detail="An unexpected error occurred.")
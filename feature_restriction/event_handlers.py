@@ -12,8 +12,14 @@ class BaseEventHandler:
     user_manager : RedisUserManager
         Manager for handling user data in Redis.
 
+    Notes
+    -----
+    Handlers declare `__slots__`, so instances carry no `__dict__` and the
+    user manager is read from a fixed slot on every event.
     """
 
+    __slots__ = ("user_manager",)
+
     def __init__(
         self,
         user_manager: RedisUserManager,
@@ -33,6 +39,9 @@ class BaseEventHandler:
         """
         Handle the event. Must be overridden by subclasses.
 
+        Handlers only update `user_data` in memory; the stream consumer saves it once,
+        after the event's rules have run.
+
         Parameters
         ----------
         event : Event
@@ -53,6 +62,7 @@ class CreditCardAddedHandler(BaseEventHandler):
     Handler for the 'credit_card_added' event.
     """
 
+    __slots__ = ()
     event_name = "credit_card_added"
 
     def handle(self, event: Event, user_data: UserData):
@@ -85,16 +95,13 @@ class CreditCardAddedHandler(BaseEventHandler):
             user_data.unique_zip_codes.add(zip_code)
             logger.info(f"Total credit cards after: {user_data.total_credit_cards}")
 
-        # Save the updated user data back to Redis
-        self.user_manager.save_user(user_data)
-        logger.info(f"User data saved after event handling {self.event_name}")
-
 
 class ScamMessageFlaggedHandler(BaseEventHandler):
     """
     Handler for the 'scam_message_flagged' event.
     """
 
+    __slots__ = ()
     event_name = "scam_message_flagged"
 
     def handle(self, event: Event, user_data: UserData):
@@ -107,15 +114,21 @@ class ScamMessageFlaggedHandler(BaseEventHandler):
             The event to be handled, containing event properties.
         user_data : UserData
             The user data associated with the event.
+
+        Raises
+        ------
+        ValueError
+            If the optional property 'count' is not a positive integer.
         """
         logger.info(f"Handling {self.event_name}")
 
-        # Increment the scam message flag count
-        user_data.scam_message_flags += 1
+        # A single event may report several flagged messages at once
+        count = event.event_properties.get("count", 1)
+        if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+            raise ValueError("'count' must be a positive integer.")
 
-        # Save the updated user data back to Redis
-        self.user_manager.save_user(user_data)
-        logger.info(f"User data saved after event handling {self.event_name}")
+        # Increment the scam message flag count
+        user_data.scam_message_flags += count
 
 
 class ChargebackOccurredHandler(BaseEventHandler):
@@ -123,6 +136,7 @@ class ChargebackOccurredHandler(BaseEventHandler):
     Handler for the 'chargeback_occurred' event.
     """
 
+    __slots__ = ()
     event_name = "chargeback_occurred"
 
     def handle(self, event: Event, user_data: UserData):
@@ -152,16 +166,13 @@ class ChargebackOccurredHandler(BaseEventHandler):
         # Update the user's total chargebacks
         user_data.total_chargebacks += amount
 
-        # Save the updated user data back to Redis
-        self.user_manager.save_user(user_data)
-        logger.info(f"User data saved after event handling {self.event_name}")
-
 
 class PurchaseMadeHandler(BaseEventHandler):
     """
     Handler for the 'purchase_made' event.
     """
 
+    __slots__ = ()
     event_name = "purchase_made"
 
     def handle(self, event: Event, user_data: UserData):
@@ -191,7 +202,3 @@ class PurchaseMadeHandler(BaseEventHandler):
         logger.info(f"Total spend before: {user_data.total_spend}")
         user_data.total_spend += amount
         logger.info(f"Total spend after: {user_data.total_spend}")
-
-        # Save the updated user data back to Redis
-        self.user_manager.save_user(user_data)
-        logger.info(f"User data saved after event handling {self.event_name}")
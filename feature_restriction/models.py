@@ -1,10 +1,22 @@
 # model.py
 
+from enum import IntFlag
 from typing import Any, Dict, Optional, Set
 
 from pydantic import BaseModel
 
 
+class AccessFlag(IntFlag):
+    """
+    Bit positions of the user actions tracked in `UserData.access_flags`.
+
+    A set bit means the user is allowed to perform the action.
+    """
+
+    can_message = 1
+    can_purchase = 2
+
+
 class Event(BaseModel):
     """
     Represents an event with a name and associated properties.
@@ -56,9 +68,9 @@ class UserData(BaseModel):
         The total amount spent by the user (default is 0.0).
     total_chargebacks : float, optional
         The total amount of chargebacks issued by the user (default is 0.0).
-    access_flags : Dict[str, bool], optional
-        A dictionary indicating access flags for user actions, such as "can_message" and "can_purchase"
-        (default is {"can_message": True, "can_purchase": True}).
+    access_flags : AccessFlag, optional
+        The actions the user is allowed to perform, packed into a single integer
+        (default is every flag set: `AccessFlag.can_message | AccessFlag.can_purchase`).
     """
 
     user_id: str
@@ -68,4 +80,4 @@ class UserData(BaseModel):
     unique_zip_codes: Set[str] = set()
     total_spend: float = 0.0
     total_chargebacks: float = 0.0
-    access_flags: Dict[str, bool] = {"can_message": True, "can_purchase": True}
+    access_flags: AccessFlag = AccessFlag.can_message | AccessFlag.can_purchase
@@ -1,5 +1,6 @@
 import json
 from abc import ABC, abstractmethod
+from typing import List
 
 import redis
 from fastapi import HTTPException
@@ -20,6 +21,10 @@ class EventPublisher(ABC):
     def add_event_to_stream(self, event: Event) -> dict:
         """Add an event to the Redis stream"""
 
+    @abstractmethod
+    def add_events_to_stream(self, events: List[Event]) -> dict:
+        """Add a batch of events to the Redis stream"""
+
 
 class RedisEventPublisher(EventPublisher):
     """
@@ -59,21 +64,7 @@ class RedisEventPublisher(EventPublisher):
         """
         try:
             logger.info(f"Received event: {event}")
-
-            # Validate event fields
-            if not event.name or not event.event_properties:
-                raise ValueError("Event is missing required fields")
-
-            # Explicitly validate user_id
-            try:
-                user_id = event.user_id  # This will trigger the property validation
-            except ValueError as ve:
-                logger.error(f"Validation error in user_id: {ve}")
-                raise HTTPException(status_code=400, detail=f"Validation error: {ve}")
-
-            # Convert the Pydantic model to a dict and serialize event_properties
-            event_data = event.dict()
-            event_data["event_properties"] = json.dumps(event_data["event_properties"])
+            event_data = self._serialize_event(event)
 
             # Add the event to the Redis stream
             self.redis_client_stream.xadd(EVENT_STREAM_KEY, event_data)
@@ -92,3 +83,77 @@ class RedisEventPublisher(EventPublisher):
             raise HTTPException(
                 status_code=500, detail="Unexpected error occurred while adding event"
             )
+
+    def add_events_to_stream(self, events: List[Event]) -> dict:
+        """
+        Add a batch of events to the Redis stream in a single round trip.
+
+        All events are validated before anything is written, then queued on a
+        non-transactional pipeline and sent to Redis with one `execute()`.
+
+        Parameters
+        ----------
+        events : List[Event]
+            The Event objects to be added to the stream, in order.
+
+        Returns
+        -------
+        dict
+            A dictionary containing a success message if the events were added successfully.
+
+        Raises
+        ------
+        HTTPException
+            If any event is invalid (400) or the batch could not be added to the stream (500).
+        """
+        try:
+            logger.info(f"Received batch of {len(events)} events")
+            if not events:
+                raise ValueError("Event batch is empty")
+
+            events_data = [self._serialize_event(event) for event in events]
+
+            pipeline = self.redis_client_stream.pipeline(transaction=False)
+            for event_data in events_data:
+                pipeline.xadd(EVENT_STREAM_KEY, event_data)
+            pipeline.execute()
+
+            logger.info(f"Added {len(events_data)} events to Redis stream")
+            return {"status": f"{len(events_data)} events added to the stream."}
+        except ValueError as ve:
+            logger.error(f"Validation error: {ve}")
+            raise HTTPException(status_code=400, detail=str(ve))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in add_events_to_stream: {e}")
+            raise HTTPException(
+                status_code=500, detail="Unexpected error occurred while adding events"
+            )
+
+    def _serialize_event(self, event: Event) -> dict:
+        """
+        Validate an event and convert it to the flat mapping stored in the stream.
+
+        Raises
+        ------
+        ValueError
+            If the event is missing required fields.
+        HTTPException
+            If the event does not carry a valid `user_id`.
+        """
+        # Validate event fields
+        if not event.name or not event.event_properties:
+            raise ValueError("Event is missing required fields")
+
+        # Explicitly validate user_id
+        try:
+            user_id = event.user_id  # This will trigger the property validation
+        except ValueError as ve:
+            logger.error(f"Validation error in user_id: {ve}")
+            raise HTTPException(status_code=400, detail=f"Validation error: {ve}")
+
+        # Convert the Pydantic model to a dict and serialize event_properties
+        event_data = event.dict()
+        event_data["event_properties"] = json.dumps(event_data["event_properties"])
+        return event_data
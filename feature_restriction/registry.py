@@ -1,3 +1,4 @@
+import sys
 from abc import ABC, abstractmethod
 
 from feature_restriction.event_handlers import (
@@ -69,7 +70,8 @@ class RuleRegistry(Registry):
             raise ValueError(
                 f"A rule with the name '{rule_name}' is already registered."
             )
-        self.rules[rule_name] = instance
+        # Interned keys let lookups with interned names match on identity
+        self.rules[sys.intern(rule_name)] = instance
 
     def get(self, name: str) -> BaseRule:
         """
@@ -159,8 +161,12 @@ class EventHandlerRegistry(Registry):
                 f"Duplicate event name detected: '{event_name}' is already registered by handler '{existing_handler}'."
             )
 
+        # Interned keys let lookups with interned names match on identity
+        event_name = sys.intern(event_name)
         self.event_handler_registry[event_name] = instance
-        self.event_rules_mapping[event_name] = rule_names or []
+        self.event_rules_mapping[event_name] = [
+            sys.intern(rule_name) for rule_name in rule_names or []
+        ]
 
     def get(self, name) -> BaseEventHandler:
         """
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 
-from .models import UserData
+from .models import AccessFlag, UserData
 from .redis_user_manager import RedisUserManager
 from .tripwire_manager import RedisTripwireManager
 from .utils import logger
@@ -76,6 +76,9 @@ class BaseRule(ABC):
         - Check if the rule is disabled.
         - Evaluate the rule and apply actions if necessary.
 
+        Changes are made to `user_data` in memory only; the stream consumer saves it once,
+        after every rule for the event has run.
+
         Parameters
         ----------
         user_data : UserData
@@ -94,10 +97,6 @@ class BaseRule(ABC):
         if self.evaluate_rule(user_data):
             self.apply_rule(user_data)
             logger.info(f"applied rule {self.name} to user {user_data.user_id}")
-
-            # Save the updated user data back to Redis
-            self.user_manager.save_user(user_data)
-            logger.info(f"User data saved after processing rule: {self.name}")
             return True
 
 
@@ -123,7 +122,7 @@ class UniqueZipCodeRule(BaseRule):
         return ratio > 0.75
 
     def apply_rule(self, user_data: UserData):
-        user_data.access_flags["can_purchase"] = False
+        user_data.access_flags &= ~AccessFlag.can_purchase
 
 
 class ScamMessageRule(BaseRule):
@@ -142,7 +141,7 @@ class ScamMessageRule(BaseRule):
         return user_data.scam_message_flags >= 2
 
     def apply_rule(self, user_data: UserData):
-        user_data.access_flags["can_message"] = False
+        user_data.access_flags &= ~AccessFlag.can_message
 
 
 class ChargebackRatioRule(BaseRule):
@@ -164,4 +163,4 @@ class ChargebackRatioRule(BaseRule):
         return ratio > 0.10
 
     def apply_rule(self, user_data: UserData):
-        user_data.access_flags["can_purchase"] = False
+        user_data.access_flags &= ~AccessFlag.can_purchase
@@ -1,12 +1,56 @@
 import time
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 import redis
 
 from feature_restriction.config import REDIS_DB_TRIPWIRE, REDIS_HOST, REDIS_PORT
 from feature_restriction.utils import logger
 
+# Prunes expired affected users, records the given ones and updates the rule's tripwire
+# state in a single server-side call.
+# KEYS: affected users sorted set, tripwire states hash
+# ARGV: rule name, current time, time window, threshold, total users, user id...
+# Returns: {previously disabled (0/1), disabled (0/1), affected user count}
+APPLY_TRIPWIRE_SCRIPT = """
+local affected_users_key = KEYS[1]
+local states_key = KEYS[2]
+local rule_name = ARGV[1]
+local now = ARGV[2]
+local cutoff = string.format('%.17g', tonumber(now) - tonumber(ARGV[3]))
+local threshold = tonumber(ARGV[4])
+local total_users = tonumber(ARGV[5])
+
+redis.call('ZREMRANGEBYSCORE', affected_users_key, '-inf', cutoff)
+for i = 6, #ARGV do
+    redis.call('ZADD', affected_users_key, now, ARGV[i])
+end
+local affected_count = redis.call('ZCARD', affected_users_key)
+
+local percentage = 0
+if total_users > 0 then
+    percentage = affected_count / total_users
+end
+
+local state = redis.call('HGET', states_key, rule_name)
+local previously_disabled = 0
+if state == '1' then
+    previously_disabled = 1
+end
+
+local disabled = 0
+if percentage >= threshold then
+    disabled = 1
+end
+
+-- Only write the state when it changes (or is not recorded yet)
+if state ~= tostring(disabled) then
+    redis.call('HSET', states_key, rule_name, tostring(disabled))
+end
+
+return {previously_disabled, disabled, affected_count}
+"""
+
 
 class TripwireManager(ABC):
     @abstractmethod
@@ -22,6 +66,15 @@ class TripwireManager(ABC):
     ) -> None:
         """Apply tripwire logic to disable a rule if too many users are affected within a time window."""
 
+    @abstractmethod
+    def apply_tripwire_bulk(
+        self,
+        rule_name: str,
+        user_ids: List[str],
+        total_users: int,
+    ) -> None:
+        """Record several affected users for a rule at once, then apply the tripwire logic."""
+
     @abstractmethod
     def get_disabled_rules(self) -> Dict[str, bool]:
         """Retrieve all rules and their disabled states from Redis."""
@@ -37,7 +90,8 @@ class RedisTripwireManager(TripwireManager):
 
     Example Redis Keys:
         - `tripwire:states`: Stores the disabled states of rules as a hash.
-        - `tripwire:affected_users:{rule_name}`: Tracks affected users for a specific rule as a Redis hash.
+        - `tripwire:affected_users:{rule_name}`: Tracks affected users for a specific rule as a sorted set
+          scored by the time each user was last affected, so expired users are pruned by score range.
 
     Attributes
     ----------
@@ -49,8 +103,12 @@ class RedisTripwireManager(TripwireManager):
         Percentage threshold of affected users to disable a rule (default: 5%).
     tripwire_states_key : str
         Redis key for storing rule states.
+    states_cache_ttl : float
+        Seconds a snapshot of the rule states is reused by `is_rule_disabled_via_tripwire`.
     affected_users_prefix : str
         Prefix for Redis keys used to store affected user data.
+    affected_users_keys : Dict[str, str]
+        Affected users key of each rule seen so far, keyed by rule name.
 
     Examples
     --------
@@ -72,7 +130,7 @@ class RedisTripwireManager(TripwireManager):
 
         tripwire:affected_users:scam_message_rule
     -----------------------------------------
-    | Field  | Value       |
+    | Member | Score       |
     -----------------------------------------
     | user_1 | 1698183437  |
     | user_2 | 1698183490  |
@@ -97,6 +155,18 @@ class RedisTripwireManager(TripwireManager):
         # Redis key names
         self.tripwire_states_key = "tripwire:states"
         self.affected_users_prefix = "tripwire:affected_users:"
+        # The set of rules is small and fixed, so each key is only built once
+        self.affected_users_keys: Dict[str, str] = {}
+
+        # Snapshot of the tripwire states hash and the monotonic time it was read at.
+        # Rule checks within `states_cache_ttl` seconds reuse it instead of hitting Redis.
+        self.states_cache_ttl = 1.0
+        self._states_cache: Optional[Tuple[float, Dict[str, str]]] = None
+
+        # Runs via EVALSHA, reloading the script automatically if Redis has flushed it
+        self.apply_tripwire_script = self.redis_client.register_script(
+            APPLY_TRIPWIRE_SCRIPT
+        )
 
     def is_rule_disabled_via_tripwire(self, rule_name: str) -> bool:
         """
@@ -111,8 +181,19 @@ class RedisTripwireManager(TripwireManager):
         -------
         bool
             True if the rule is disabled, False otherwise.
+
+        Notes
+        -----
+        The states of all rules are read with one HGETALL and cached for
+        `states_cache_ttl` seconds, so a state changed by another process may be seen up
+        to that long after the change. Changes made through this manager are seen at once.
         """
-        disabled = self.redis_client.hget(self.tripwire_states_key, rule_name) == "1"
+        now = time.monotonic()
+        cache = self._states_cache
+        if cache is None or now - cache[0] >= self.states_cache_ttl:
+            cache = (now, self.redis_client.hgetall(self.tripwire_states_key))
+            self._states_cache = cache
+        disabled = cache[1].get(rule_name) == "1"
         logger.info(f"Rule '{rule_name}' is disabled: {disabled}")
         return disabled
 
@@ -131,49 +212,89 @@ class RedisTripwireManager(TripwireManager):
             The name of the rule.
         user_id : str
             The ID of the user triggering the rule.
+        total_users : int
+            The total number of users, used to compute the affected percentage.
 
         Returns
         -------
         None
+
+        Notes
+        -----
+        The whole update runs as one Lua script (`APPLY_TRIPWIRE_SCRIPT`), so it costs a
+        single round trip and concurrent consumers cannot interleave their updates.
         """
-        current_time = time.time()
-        affected_users_key = f"{self.affected_users_prefix}{rule_name}"
+        self.apply_tripwire_bulk(rule_name, [user_id], total_users)
 
-        # Remove expired entries
-        expired_users = []
-        for uid, timestamp in self.redis_client.hgetall(affected_users_key).items():
-            if float(timestamp) <= current_time - self.time_window:
-                expired_users.append(uid)
+    def apply_tripwire_bulk(
+        self,
+        rule_name: str,
+        user_ids: List[str],
+        total_users: int,
+    ) -> None:
+        """
+        Record several affected users for a rule at once, then apply the tripwire logic.
 
-        if expired_users:
-            self.redis_client.hdel(affected_users_key, *expired_users)
+        All users share the current timestamp and the threshold is evaluated once, after
+        every user has been added, in a single call to `APPLY_TRIPWIRE_SCRIPT`.
 
-        # Add or update the current user
-        self.redis_client.hset(affected_users_key, user_id, current_time)
+        Parameters
+        ----------
+        rule_name : str
+            The name of the rule.
+        user_ids : List[str]
+            The IDs of the users triggering the rule.
+        total_users : int
+            The total number of users, used to compute the affected percentage.
 
-        # # Get the total number of users
-        # total_users: int = self.user_manager.get_user_count()
+        Returns
+        -------
+        None
 
-        # Calculate the percentage of affected users
-        affected_count = self.redis_client.hlen(affected_users_key)
-        percentage = affected_count / total_users if total_users > 0 else 0
+        Raises
+        ------
+        ValueError
+            If `user_ids` is empty.
+        """
+        if not user_ids:
+            raise ValueError("At least one user ID is required.")
 
-        # Update tripwire state based on percentage
-        previously_disabled = (
-            self.redis_client.hget(self.tripwire_states_key, rule_name) == "1"
+        current_time = time.time()
+        affected_users_key = self.affected_users_keys.get(rule_name)
+        if affected_users_key is None:
+            affected_users_key = f"{self.affected_users_prefix}{rule_name}"
+            self.affected_users_keys[rule_name] = affected_users_key
+
+        # Expire old users, add the new ones, count and update the state atomically
+        previously_disabled, disabled, affected_count = self.apply_tripwire_script(
+            keys=[affected_users_key, self.tripwire_states_key],
+            args=[
+                rule_name,
+                current_time,
+                self.time_window,
+                self.threshold,
+                total_users,
+                *user_ids,
+            ],
         )
-        if percentage >= self.threshold:
-            self.redis_client.hset(self.tripwire_states_key, rule_name, "1")
-            if not previously_disabled:
-                logger.info(
-                    f"Tripwire thrown: Rule '{rule_name}' disabled: {affected_count}/{total_users} users affected ({percentage:.2%})."
-                )
-        else:
-            self.redis_client.hset(self.tripwire_states_key, rule_name, "0")
-            if previously_disabled:
-                logger.info(
-                    f"Tripwire disengaged: Rule '{rule_name}' re-enabled: {affected_count}/{total_users} users affected ({percentage:.2%})."
-                )
+        percentage = affected_count / total_users if total_users > 0 else 0
+        if disabled != previously_disabled:
+            self.invalidate_states_cache()
+
+        if disabled and not previously_disabled:
+            logger.info(
+                f"Tripwire thrown: Rule '{rule_name}' disabled: {affected_count}/{total_users} users affected ({percentage:.2%})."
+            )
+        elif previously_disabled and not disabled:
+            logger.info(
+                f"Tripwire disengaged: Rule '{rule_name}' re-enabled: {affected_count}/{total_users} users affected ({percentage:.2%})."
+            )
+
+    def invalidate_states_cache(self) -> None:
+        """
+        Drop the cached tripwire states so the next rule check reads them from Redis.
+        """
+        self._states_cache = None
 
     def get_disabled_rules(self) -> Dict[str, bool]:
         """
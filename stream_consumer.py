@@ -1,10 +1,11 @@
-import json
 import logging
+import sys
 import threading
 import time
 from abc import ABC, abstractmethod
 from typing import List
 
+import orjson
 import redis
 
 from feature_restriction.clients import (
@@ -140,10 +141,18 @@ class RedisStreamConsumer(StreamConsumer):
         Exception
             If an error occurs during event processing.
         """
+        user_data = None
         try:
             logger.info(f"Processing event: {event_data.get('name')}")
-            event_data["event_properties"] = json.loads(event_data["event_properties"])
-            event = Event(**event_data)
+            event_data["event_properties"] = orjson.loads(
+                event_data["event_properties"]
+            )
+            # The name is looked up in both registries; interning it lets those
+            # lookups match the registered keys on identity
+            event_data["name"] = sys.intern(event_data["name"])
+            # The publisher validated the event before adding it to the stream, so
+            # build it without running pydantic validation a second time
+            event = Event.model_construct(**event_data)
 
             user_id = event.event_properties["user_id"]
             try:
@@ -151,17 +160,22 @@ class RedisStreamConsumer(StreamConsumer):
             except KeyError:
                 user_data = self.user_manager.create_user(user_id)
 
-            logger.info(
-                f"display user data before handler: {self.user_manager.display_user_data(user_id)}"
-            )
+            # The user and rule state dumps are debug output; skip building them (and
+            # the Redis reads behind the rule states) unless they are logged
+            log_debug = logger.isEnabledFor(logging.DEBUG)
+            if log_debug:
+                logger.debug(
+                    f"display user data before handler: {self.user_manager.display_user_data(user_id, user_data)}"
+                )
             # STEP !: process the event
             handler = self.event_registry.get(event.name)
             if handler:
                 handler.handle(event, user_data)
 
-            logger.info(
-                f"display user data after handler: {self.user_manager.display_user_data(user_id)}"
-            )
+            if log_debug:
+                logger.debug(
+                    f"display user data after handler: {self.user_manager.display_user_data(user_id, user_data)}"
+                )
 
             # STEP 2: process the rules
             rule_names: List[str] = self.event_registry.get_rules_for_event(event.name)
@@ -174,26 +188,35 @@ class RedisStreamConsumer(StreamConsumer):
 
                     if rule_applied:
                         # STEP 3: apply tripwire if needed
-                        logger.info(
-                            f"disabled rules before: {self.tripwire_manager.get_disabled_rules()}"
-                        )
+                        if log_debug:
+                            logger.debug(
+                                f"disabled rules before: {self.tripwire_manager.get_disabled_rules()}"
+                            )
                         # Get the total number of users
                         total_users: int = self.user_manager.get_user_count()
                         self.tripwire_manager.apply_tripwire_if_needed(
                             rule.name, user_data.user_id, total_users
                         )
-                        logger.info(
-                            f"disabled rules after: {self.tripwire_manager.get_disabled_rules()}"
-                        )
-
-            logger.info(
-                f"display user data after rule: {self.user_manager.display_user_data(user_id)}"
-            )
+                        if log_debug:
+                            logger.debug(
+                                f"disabled rules after: {self.tripwire_manager.get_disabled_rules()}"
+                            )
+
+            if log_debug:
+                logger.debug(
+                    f"display user data after rule: {self.user_manager.display_user_data(user_id, user_data)}"
+                )
             logger.info(f"Event '{event.name}' processed successfully.")
             logger.info(f"*******************")
 
         except Exception as e:
             logger.error(f"Error processing event '{event_id}': {e}")
+        finally:
+            # STEP 4: persist the handler's and rules' changes in a single write. This
+            # also runs when a rule or the tripwire fails, since the event is still
+            # acknowledged and the handler's update would otherwise be lost.
+            if user_data is not None:
+                self.user_manager.save_user(user_data)
 
     def start(self):
         """
@@ -253,9 +276,9 @@ if __name__ == "__main__":
         redis_client_tripwire.flushdb()
         logger.info("Databases cleared.")
 
-        stream_keys_count = len(redis_client_stream.keys("*"))
-        user_keys_count = len(redis_client_user.keys("*"))
-        tripwire_count = len(redis_client_tripwire.keys("*"))
+        stream_keys_count = redis_client_stream.dbsize()
+        user_keys_count = redis_client_user.dbsize()
+        tripwire_count = redis_client_tripwire.dbsize()
 
         logger.info(f"Number of keys in Redis stream database: {stream_keys_count}")
         logger.info(f"Number of keys in Redis user database: {user_keys_count}")
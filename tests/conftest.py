@@ -1,14 +1,26 @@
 import os
 import subprocess
-import time
+import sys
+import tempfile
 from unittest.mock import MagicMock, patch
 
+import fakeredis
 import pytest
 import redis
 from fastapi.testclient import TestClient
 
+# Under pytest-xdist each worker ("gw0", "gw1", ...) gets its own block of Redis DBs,
+# starting above REDIS_DB_LOCUST (3) so the Locust data is never flushed.
+# This must run before the app/config imports below, which read REDIS_DB_OFFSET.
+_xdist_worker = os.environ.get("PYTEST_XDIST_WORKER")
+if _xdist_worker:
+    os.environ["REDIS_DB_OFFSET"] = str(int(_xdist_worker[2:]) * 3 + 4)
+
 from app import app  # Import your FastAPI app
 from feature_restriction.config import (
+    CONSUMER_GROUP,
+    EVENT_STREAM_KEY,
+    REDIS_DB_OFFSET,
     REDIS_DB_STREAM,
     REDIS_DB_TRIPWIRE,
     REDIS_DB_USER,
@@ -16,12 +28,15 @@ from feature_restriction.config import (
     REDIS_PORT,
 )
 from feature_restriction.endpoint_access import RedisEndpointAccess
-from feature_restriction.models import Event, UserData
+from feature_restriction.models import AccessFlag, Event, UserData
 from feature_restriction.publisher import RedisEventPublisher
 from feature_restriction.redis_user_manager import RedisUserManager
 from feature_restriction.registry import EventHandlerRegistry, RuleRegistry
 from feature_restriction.tripwire_manager import RedisTripwireManager
 from stream_consumer import RedisStreamConsumer
+from tests.helpers import wait_until
+
+CONSUMER_PYCACHE_PREFIX = os.path.join(tempfile.gettempdir(), "feature_restriction_pyc")
 
 
 @pytest.fixture
@@ -105,17 +120,28 @@ def stream_consumer(
 
 
 @pytest.fixture
-def event_publisher(mock_redis):
-    """Fixture to create an RedisEventPublisher instance with a mock Redis client."""
-    return RedisEventPublisher(redis_client=mock_redis["stream"])
+def fake_redis_stream():
+    """
+    Provide an in-memory fakeredis client standing in for the stream database.
+    """
+    return fakeredis.FakeStrictRedis(decode_responses=True)
 
 
 @pytest.fixture
+def event_publisher(fake_redis_stream):
+    """Fixture to create an RedisEventPublisher instance with an in-memory Redis client."""
+    return RedisEventPublisher(redis_client=fake_redis_stream)
+
+
+# The event fixtures below hold known-good data, so they are built once per module with
+# `model_construct`, which skips validation. Tests must treat them as read-only; tests
+# that need invalid events construct them inline with `Event(...)`.
+@pytest.fixture(scope="module")
 def valid_event():
     """
     Fixture to provide a valid Event instance.
     """
-    return Event(
+    return Event.model_construct(
         name="credit_card_added",
         event_properties={
             "user_id": "test_user",
@@ -125,94 +151,192 @@ def valid_event():
     )
 
 
+@pytest.fixture(scope="module")
+def credit_card_event():
+    """
+    Fixture to provide a 'credit_card_added' event for a card the sample user does not have yet.
+    """
+    return Event.model_construct(
+        name="credit_card_added",
+        event_properties={
+            "user_id": "test_user",
+            "card_id": "card_002",
+            "zip_code": "54321",
+        },
+    )
+
+
+@pytest.fixture(scope="module")
+def scam_message_event():
+    """
+    Fixture to provide a 'scam_message_flagged' event.
+    """
+    return Event.model_construct(
+        name="scam_message_flagged", event_properties={"user_id": "test_user"}
+    )
+
+
+@pytest.fixture(scope="module")
+def chargeback_event():
+    """
+    Fixture to provide a 'chargeback_occurred' event.
+    """
+    return Event.model_construct(
+        name="chargeback_occurred",
+        event_properties={"user_id": "test_user", "amount": 50.0},
+    )
+
+
+@pytest.fixture(scope="module")
+def purchase_event():
+    """
+    Fixture to provide a 'purchase_made' event.
+    """
+    return Event.model_construct(
+        name="purchase_made",
+        event_properties={"user_id": "test_user", "amount": 100.0},
+    )
+
+
+# Validated once at import; sample_user_data hands each test its own deep copy
+_SAMPLE_USER_DATA = UserData(
+    user_id="test_user",
+    scam_message_flags=1,
+    credit_cards={"card_001": "12345"},
+    total_credit_cards=1,
+    unique_zip_codes={"12345"},
+    total_spend=100.0,
+    total_chargebacks=5.0,
+    access_flags=AccessFlag.can_message | AccessFlag.can_purchase,
+)
+
+
 @pytest.fixture
 def sample_user_data():
     """
     Create sample UserData for testing.
+
+    Tests may mutate the returned instance freely; it never shares state with the template.
     """
-    return UserData(
-        user_id="test_user",
-        scam_message_flags=1,
-        credit_cards={"card_001": "12345"},
-        total_credit_cards=1,
-        unique_zip_codes={"12345"},
-        total_spend=100.0,
-        total_chargebacks=5.0,
-        access_flags={"can_message": True, "can_purchase": True},
-    )
+    return _SAMPLE_USER_DATA.model_copy(deep=True)
 
 
 ###### MOCKS FOR INTEGRATION TETS ######
 #######################################################################################
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def test_client():
     """
-    Fixture to provide a FastAPI test client.
+    Fixture to provide a FastAPI test client shared by the session.
+
+    The app's startup and shutdown handlers run once, when the client is first used and
+    at the end of the session. Tests must not rely on per-test app state.
     """
-    return TestClient(app)
+    with TestClient(app) as client:
+        yield client
 
 
 @pytest.fixture(scope="function")
 def redis_stream():
     """
-    Fixture to provide a clean Redis instance for stream testing.
+    Fixture to provide a Redis instance for stream testing.
+
+    The integration suite's autouse `reset_redis_dbs` fixture flushes it around each test.
     """
-    client = redis.StrictRedis(
+    return redis.StrictRedis(
         host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB_STREAM, decode_responses=True
     )
-    client.flushdb()  # Clear the Redis database
-    yield client
-    client.flushdb()  # Clean up after the test
 
 
-@pytest.fixture(scope="function")
-def redis_user():
+@pytest.fixture(scope="session")
+def redis_user_client():
     """
-    Fixture to provide a clean Redis instance for user management testing.
+    Fixture to provide a single Redis client for the user database, shared by the session.
     """
-    client = redis.StrictRedis(
+    return redis.StrictRedis(
         host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB_USER, decode_responses=True
     )
-    client.flushdb()  # Clear the Redis database
-    yield client
-    client.flushdb()  # Clean up after the test
 
 
 @pytest.fixture(scope="function")
-def redis_tripwire():
+def redis_user(redis_user_client):
+    """
+    Fixture to provide a Redis instance for user management testing.
+
+    The integration suite's autouse `reset_redis_dbs` fixture flushes it around each test.
+    """
+    return redis_user_client
+
+
+@pytest.fixture(scope="session")
+def redis_tripwire_client():
     """
-    Fixture to provide a clean Redis instance for the RedisTripwireManager.
+    Fixture to provide a single Redis client for the tripwire database, shared by the session.
     """
-    client = redis.StrictRedis(
+    return redis.StrictRedis(
         host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB_TRIPWIRE, decode_responses=True
     )
-    client.flushdb()  # Clear the Redis database
-    yield client
-    client.flushdb()  # Clean up after the test
+
+
+@pytest.fixture(scope="function")
+def redis_tripwire(redis_tripwire_client):
+    """
+    Fixture to provide a Redis instance for the RedisTripwireManager.
+
+    The integration suite's autouse `reset_redis_dbs` fixture flushes it around each test.
+    """
+    return redis_tripwire_client
 
 
 @pytest.fixture(scope="function")
 def stream_consumer_subprocess():
     """
     Fixture to run the Redis stream consumer as a subprocess.
+
+    Blocks until the consumer has flushed its databases and created its consumer group,
+    so events posted by the test are guaranteed to be read.
     """
-    # Calculate the path to the consumer script
-    script_dir = os.path.dirname(
+    # Calculate the path to the repository root holding the consumer module
+    repo_root = os.path.dirname(
         os.path.dirname(os.path.abspath(__file__))
     )  # Navigate up from ./tests
-    script_path = os.path.join(script_dir, "stream_consumer.py")
+    script_path = os.path.join(repo_root, "stream_consumer.py")
 
     # Verify the script exists
     if not os.path.exists(script_path):
         raise FileNotFoundError(f"Consumer script not found at {script_path}")
 
-    # Start the consumer as a subprocess
+    # Start the consumer as a subprocess on this worker's Redis DBs. Bytecode goes to a
+    # shared cache dir so every consumer launched in the session reuses compiled modules.
+    env = {
+        **os.environ,
+        "REDIS_DB_OFFSET": str(REDIS_DB_OFFSET),
+        "PYTHONPYCACHEPREFIX": CONSUMER_PYCACHE_PREFIX,
+    }
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
     process = subprocess.Popen(
-        ["python", script_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        [sys.executable, "-OO", "-m", "stream_consumer"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=repo_root,
+        env=env,
     )
     print("consumer running as subprocess")
-    # Wait for the consumer to initialize
-    time.sleep(1)  # Adjust based on startup time
+
+    # Wait for the consumer to initialize: the group is created after its startup flush
+    stream_client = redis.StrictRedis(
+        host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB_STREAM, decode_responses=True
+    )
+
+    def consumer_group_ready():
+        try:
+            groups = stream_client.xinfo_groups(EVENT_STREAM_KEY)
+        except redis.exceptions.ResponseError:  # Stream not created yet
+            return False
+        return any(group["name"] == CONSUMER_GROUP for group in groups)
+
+    if not wait_until(consumer_group_ready, timeout=10):
+        process.kill()
+        raise RuntimeError("Stream consumer did not create its consumer group in time")
 
     yield process  # Yield the subprocess for testing
 
@@ -0,0 +1,31 @@
+import time
+from typing import Callable
+
+
+def wait_until(
+    predicate: Callable[[], bool], timeout: float = 5.0, interval: float = 0.05
+) -> bool:
+    """
+    Poll a predicate until it holds or the timeout elapses.
+
+    Parameters
+    ----------
+    predicate : Callable[[], bool]
+        A zero-argument callable that returns True once the awaited condition is met.
+    timeout : float, optional
+        The maximum number of seconds to wait. Defaults to 5.0.
+    interval : float, optional
+        The number of seconds to sleep between polls. Defaults to 0.05.
+
+    Returns
+    -------
+    bool
+        True if the predicate held before the timeout, False otherwise.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        if predicate():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
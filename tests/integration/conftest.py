@@ -0,0 +1,91 @@
+import pytest
+import redis
+
+from feature_restriction.config import (
+    REDIS_DB_LOCUST,
+    REDIS_DB_STREAM,
+    REDIS_DB_TRIPWIRE,
+    REDIS_DB_USER,
+    REDIS_HOST,
+    REDIS_PORT,
+)
+from feature_restriction.redis_user_manager import RedisUserManager
+from feature_restriction.tripwire_manager import RedisTripwireManager
+
+
+def _flush_all_dbs(client):
+    """
+    Flush the stream, user, and tripwire databases in one MULTI/EXEC round trip.
+
+    The transaction SELECTs each database in turn and finally SELECTs the client's own
+    database again, so the pooled connection is returned in the state it was taken.
+    """
+    with client.pipeline(transaction=True) as pipe:
+        for db in (REDIS_DB_STREAM, REDIS_DB_USER, REDIS_DB_TRIPWIRE):
+            pipe.execute_command("SELECT", db)
+            pipe.flushdb()
+        pipe.execute_command("SELECT", REDIS_DB_USER)
+        pipe.execute()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def check_redis_db_range():
+    """
+    Fail with a clear message when this worker's Redis DBs do not exist on the server.
+
+    Each pytest-xdist worker takes a block of three DBs above REDIS_DB_LOCUST, so the
+    server's `databases` setting caps the number of workers. Selecting the highest DB
+    is enough to check the whole block.
+    """
+    highest_db = max(REDIS_DB_STREAM, REDIS_DB_USER, REDIS_DB_TRIPWIRE)
+    client = redis.StrictRedis(host=REDIS_HOST, port=REDIS_PORT, db=highest_db)
+    try:
+        client.ping()
+    except redis.exceptions.ResponseError as e:
+        if "out of range" not in str(e):
+            raise
+        pytest.fail(
+            f"Redis DB {highest_db} is out of range on the server. Each pytest-xdist "
+            f"worker needs three DBs above DB {REDIS_DB_LOCUST}; run with fewer workers "
+            f"or raise `databases` in the Redis config.",
+            pytrace=False,
+        )
+    finally:
+        client.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_redis_dbs(redis_user_client, tripwire_manager):
+    """
+    Give every integration test empty Redis databases and clean up after it.
+
+    The shared tripwire manager's cached rule states are dropped with the data, so no
+    test sees states left over from the previous one.
+    """
+    _flush_all_dbs(redis_user_client)
+    tripwire_manager.invalidate_states_cache()
+    yield
+    _flush_all_dbs(redis_user_client)
+    tripwire_manager.invalidate_states_cache()
+
+
+@pytest.fixture(scope="session")
+def user_manager(redis_user_client):
+    """
+    Provide a RedisUserManager backed by the real user database, shared by the session.
+
+    Overrides the mocked `user_manager` fixture used by the unit tests. Test data is
+    flushed around each test by `reset_redis_dbs`.
+    """
+    return RedisUserManager(redis_user_client)
+
+
+@pytest.fixture(scope="session")
+def tripwire_manager(redis_tripwire_client):
+    """
+    Provide a RedisTripwireManager backed by the real tripwire database, shared by the session.
+
+    Overrides the mocked `tripwire_manager` fixture used by the unit tests, and registers
+    the tripwire Lua script once for the whole suite.
+    """
+    return RedisTripwireManager(redis_tripwire_client)
@@ -1,14 +1,32 @@
-import json
+import asyncio
 import time
+from functools import lru_cache
 
+import httpx
+import orjson
+import pytest
+
+from app import app
 from feature_restriction.config import EVENT_STREAM_KEY
 from feature_restriction.models import Event
 from feature_restriction.publisher import RedisEventPublisher
-from feature_restriction.redis_user_manager import RedisUserManager
+from tests.helpers import wait_until
+
+_JSON = {"content-type": "application/json"}
+
+
+@lru_cache(maxsize=64)
+def _mk_event(name: str, props_json: str) -> Event:
+    """
+    Build an Event once per distinct (name, properties) pair and reuse it.
+
+    Callers must treat the returned Event as read-only, since it is shared.
+    """
+    return Event(name=name, event_properties=orjson.loads(props_json))
 
 
 def test_scam_message_flagged_event(
-    redis_stream, redis_user, stream_consumer_subprocess, redis_tripwire
+    redis_stream, redis_user, user_manager, stream_consumer_subprocess, redis_tripwire
 ):
     """
     Test that RedisStreamConsumer processes 'scam_message_flagged' events.
@@ -16,10 +34,9 @@ def test_scam_message_flagged_event(
     time.sleep(1)  # Adjust timing based on system performance
     # Arrange
     publisher = RedisEventPublisher(redis_stream)
-    user_manager = RedisUserManager(redis_user)
 
     # Publish the event
-    event = Event(name="scam_message_flagged", event_properties={"user_id": "12345"})
+    event = _mk_event("scam_message_flagged", '{"user_id": "12345"}')
     publisher.add_event_to_stream(event)
     time.sleep(1)  # Wait for the consumer to process
 
@@ -30,7 +47,7 @@ def test_scam_message_flagged_event(
 
 
 def test_event_publishing_and_consuming(
-    redis_stream, redis_user, stream_consumer_subprocess, redis_tripwire
+    redis_stream, redis_user, user_manager, stream_consumer_subprocess, redis_tripwire
 ):
     """
     Test the integration between RedisEventPublisher and RedisStreamConsumer.
@@ -40,16 +57,11 @@ def test_event_publishing_and_consuming(
     publisher = RedisEventPublisher(
         redis_stream
     )  # Uses redis_stream via RedisEventPublisher
-    user_manager = RedisUserManager(redis_user)
 
     # Create an Event object to mirror the API flow
-    event = Event(
-        name="credit_card_added",
-        event_properties={
-            "user_id": "12345",
-            "card_id": "card_001",
-            "zip_code": "54321",
-        },
+    event = _mk_event(
+        "credit_card_added",
+        '{"user_id": "12345", "card_id": "card_001", "zip_code": "54321"}',
     )
 
     # Act: Publish the event using RedisEventPublisher
@@ -68,7 +80,7 @@ def test_event_publishing_and_consuming(
 
 
 def test_event_processing_via_consumer(
-    redis_stream, redis_user, stream_consumer_subprocess, redis_tripwire
+    redis_stream, redis_user, user_manager, stream_consumer_subprocess, redis_tripwire
 ):
     """
     Test that RedisStreamConsumer processes events from the stream and updates user data.
@@ -78,10 +90,9 @@ def test_event_processing_via_consumer(
     publisher = RedisEventPublisher(
         redis_stream
     )  # Uses redis_stream via RedisEventPublisher
-    user_manager = RedisUserManager(redis_user)
 
     # Create an Event object to simulate a realistic API call
-    event = Event(name="scam_message_flagged", event_properties={"user_id": "12345"})
+    event = _mk_event("scam_message_flagged", '{"user_id": "12345"}')
 
     # Act: Publish the event using RedisEventPublisher
     publisher.add_event_to_stream(event)
@@ -101,7 +112,7 @@ def test_event_processing_via_consumer(
 
 
 def test_chargeback_occurred_event(
-    redis_stream, redis_user, stream_consumer_subprocess, redis_tripwire
+    redis_stream, redis_user, user_manager, stream_consumer_subprocess, redis_tripwire
 ):
     """
     Test that RedisStreamConsumer processes 'chargeback_occurred' events.
@@ -109,12 +120,8 @@ def test_chargeback_occurred_event(
     time.sleep(1)
     # Arrange
     publisher = RedisEventPublisher(redis_stream)
-    user_manager = RedisUserManager(redis_user)
 
-    event = Event(
-        name="chargeback_occurred",
-        event_properties={"user_id": "12345", "amount": 123.45},
-    )
+    event = _mk_event("chargeback_occurred", '{"user_id": "12345", "amount": 123.45}')
 
     # Act
     publisher.add_event_to_stream(event)
@@ -126,31 +133,44 @@ def test_chargeback_occurred_event(
     assert user_data.user_id == "12345"
 
 
-def test_e2e_concurrent_events(
-    test_client, redis_stream, redis_user, stream_consumer_subprocess, redis_tripwire
+@pytest.mark.asyncio
+async def test_e2e_concurrent_events(
+    redis_stream,
+    redis_user,
+    user_manager,
+    stream_consumer_subprocess,
+    redis_tripwire,
 ):
     """
     Test the end-to-end flow for concurrent events affecting multiple users.
     """
-    time.sleep(1)
     # Arrange
-    user_manager = RedisUserManager(redis_user)
     users = [
         {"user_id": "12345", "card_id": "card_001", "zip_code": "54321"},
         {"user_id": "67890", "card_id": "card_002", "zip_code": "98765"},
     ]
+    payloads = [
+        {"name": "credit_card_added", "event_properties": user} for user in users
+    ]
 
     # Act: Send events concurrently for multiple users
-    for user in users:
-        event_payload = {
-            "name": "credit_card_added",
-            "event_properties": user,
-        }
-        response = test_client.post("/event", json=event_payload)
-        assert response.status_code == 200
-
-    # Allow time for the consumer to process the events
-    time.sleep(1)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        responses = await asyncio.gather(
+            *(
+                c.post("/event", content=orjson.dumps(payload), headers=_JSON)
+                for payload in payloads
+            )
+        )
+    assert all(response.status_code == 200 for response in responses)
+
+    # Wait for the consumer to process the events
+    def all_cards_recorded():
+        return all(
+            user["card_id"] in (redis_user.get(user["user_id"]) or "") for user in users
+        )
+
+    assert wait_until(all_cards_recorded)
 
     # Assert: Validate user data for each user
     for user in users:
@@ -160,13 +180,6 @@ def test_e2e_concurrent_events(
         assert user["zip_code"] in user_data.unique_zip_codes
 
 
-import json
-import time
-
-from feature_restriction.config import EVENT_STREAM_KEY
-from feature_restriction.redis_user_manager import RedisUserManager
-
-
 def test_event_publishing_to_stream(
     test_client, redis_stream, redis_tripwire, redis_user, stream_consumer_subprocess
 ):
@@ -188,7 +201,9 @@ def test_event_publishing_to_stream(
     }
 
     # Act
-    response = test_client.post("/event", json=event_payload)
+    response = test_client.post(
+        "/event", content=orjson.dumps(event_payload), headers=_JSON
+    )
 
     # Assert
     assert response.status_code == 200
@@ -196,27 +211,63 @@ def test_event_publishing_to_stream(
         "status": "Event 'credit_card_added' added to the stream."
     }
 
-    # Check Redis stream for the event
-    events = redis_stream.xrange(EVENT_STREAM_KEY)
-    assert len(events) == 1  # Ensure exactly one event was added
+    # Check Redis stream for the event, ensuring exactly one event was added
+    assert redis_stream.xlen(EVENT_STREAM_KEY) == 1
+    events = redis_stream.xrange(EVENT_STREAM_KEY, count=1)
 
     # Validate the event content
     event_id, event_data = events[0]
     assert event_data["name"] == "credit_card_added"
     assert (
-        json.loads(event_data["event_properties"]) == event_payload["event_properties"]
+        orjson.loads(event_data["event_properties"])
+        == event_payload["event_properties"]
     )
 
 
+def test_event_batch_publishing_to_stream(
+    test_client, redis_stream, redis_tripwire, redis_user, stream_consumer_subprocess
+):
+    """
+    Test if a batch of events is added to the Redis stream in order.
+    """
+    time.sleep(1)
+    redis_stream.delete(EVENT_STREAM_KEY)
+    # Arrange
+    events_payload = [
+        {
+            "name": "purchase_made",
+            "event_properties": {"user_id": "12345", "amount": 100.00},
+        },
+        {
+            "name": "chargeback_occurred",
+            "event_properties": {"user_id": "12345", "amount": 15.00},
+        },
+    ]
+
+    # Act
+    response = test_client.post(
+        "/events:batch", content=orjson.dumps(events_payload), headers=_JSON
+    )
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"status": "2 events added to the stream."}
+
+    events = redis_stream.xrange(EVENT_STREAM_KEY)
+    assert [event_data["name"] for _, event_data in events] == [
+        "purchase_made",
+        "chargeback_occurred",
+    ]
+
+
 def test_multiple_event_handling_via_endpoint(
-    test_client, redis_stream, redis_user, stream_consumer_subprocess
+    test_client, redis_stream, redis_user, user_manager, stream_consumer_subprocess
 ):
     """
     Test the processing of multiple events in sequence via the endpoint.
     """
     time.sleep(1)
     # Arrange
-    user_manager = RedisUserManager(redis_user)
     user_id = "12345"
 
     events = [
@@ -240,7 +291,9 @@ def test_multiple_event_handling_via_endpoint(
 
     # Act: Send events to the endpoint
     for event in events:
-        response = test_client.post("/event", json=event)
+        response = test_client.post(
+            "/event", content=orjson.dumps(event), headers=_JSON
+        )
         assert response.status_code == 200
         assert response.json() == {
             "status": f"Event '{event['name']}' added to the stream."
@@ -273,7 +326,9 @@ def test_event_with_missing_data_via_endpoint(
     }
 
     # Act
-    response = test_client.post("/event", json=invalid_event)
+    response = test_client.post(
+        "/event", content=orjson.dumps(invalid_event), headers=_JSON
+    )
 
     # Assert
     assert response.status_code == 400  # Bad Request
@@ -283,8 +338,7 @@ def test_event_with_missing_data_via_endpoint(
     time.sleep(1)
 
     # Assert no user data created
-    all_keys = redis_user.keys("*")
-    assert len(all_keys) == 0  # Ensure no user was added
+    assert redis_user.dbsize() == 0  # Ensure no user was added
 
     # Check logs for error handling
     assert "Validation error" in caplog.text
@@ -1,15 +1,16 @@
-import time
+import orjson
 
-from feature_restriction.redis_user_manager import RedisUserManager
+from tests.helpers import wait_until
 
+_JSON = {"content-type": "application/json"}
 
-def test_can_purchase_enabled(redis_user, redis_stream, test_client):
+
+def test_can_purchase_enabled(redis_user, user_manager, redis_stream, test_client):
     """
     Test the /canpurchase endpoint when the user is allowed to make purchases.
     """
     # Arrange
     user_id = "user_123"
-    user_manager = RedisUserManager(redis_user)
     user_data = user_manager.create_user(user_id)
 
     # Act: Query the /canpurchase endpoint
@@ -20,13 +21,12 @@ def test_can_purchase_enabled(redis_user, redis_stream, test_client):
     assert response.json() == {"can_purchase": True}
 
 
-def test_can_message_enabled(redis_user, redis_stream, test_client):
+def test_can_message_enabled(redis_user, user_manager, redis_stream, test_client):
     """
     Test the /canmessage endpoint when the user is allowed to send/receive messages.
     """
     # Arrange
     user_id = "user_789"
-    user_manager = RedisUserManager(redis_user)
     user_data = user_manager.create_user(user_id)
 
     # Act: Query the /canmessage endpoint
@@ -37,52 +37,67 @@ def test_can_message_enabled(redis_user, redis_stream, test_client):
     assert response.json() == {"can_message": True}
 
 
+def test_access_enabled(redis_user, user_manager, redis_stream, test_client):
+    """
+    Test the /access endpoint returns every access flag for a user.
+    """
+    # Arrange
+    user_id = "user_321"
+    user_manager.create_user(user_id)
+
+    # Act: Query the /access endpoint
+    response = test_client.get("/access", params={"user_id": user_id})
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"can_message": True, "can_purchase": True}
+
+
 def test_can_purchase_disabled(
     redis_user, redis_stream, test_client, stream_consumer_subprocess, redis_tripwire
 ):
     """
     Test the /canpurchase endpoint when the user is restricted from making purchases.
     """
-    time.sleep(1)
     # Arrange
     user_id = "user_456"
-    user_manager = RedisUserManager(redis_user)
 
-    # Trigger a rule to disable purchase
-    event_payload = {
-        "name": "credit_card_added",
-        "event_properties": {
-            "user_id": user_id,
-            "card_id": "card_001",
-            "zip_code": "12345",
+    # Add three cards with unique zip codes in one batch to trigger the rule
+    events_payload = [
+        {
+            "name": "credit_card_added",
+            "event_properties": {
+                "user_id": user_id,
+                "card_id": "card_001",
+                "zip_code": "12345",
+            },
         },
-    }
-    test_client.post("/event", json=event_payload)
-
-    # Add another unique zip code to trigger the rule
-    event_payload_2 = {
-        "name": "credit_card_added",
-        "event_properties": {
-            "user_id": user_id,
-            "card_id": "card_002",
-            "zip_code": "54321",
+        {
+            "name": "credit_card_added",
+            "event_properties": {
+                "user_id": user_id,
+                "card_id": "card_002",
+                "zip_code": "54321",
+            },
         },
-    }
-    test_client.post("/event", json=event_payload_2)
-
-    # Add another unique zip code to trigger the rule
-    event_payload_3 = {
-        "name": "credit_card_added",
-        "event_properties": {
-            "user_id": user_id,
-            "card_id": "card_003",
-            "zip_code": "67891",
+        {
+            "name": "credit_card_added",
+            "event_properties": {
+                "user_id": user_id,
+                "card_id": "card_003",
+                "zip_code": "67891",
+            },
         },
-    }
-    test_client.post("/event", json=event_payload_3)
+    ]
+    test_client.post(
+        "/events:batch", content=orjson.dumps(events_payload), headers=_JSON
+    )
 
-    # Allow time for the consumer to process
-    time.sleep(3)
+    # Wait for the consumer to process
+    assert wait_until(
+        lambda: test_client.get("/canpurchase", params={"user_id": user_id}).json()
+        == {"can_purchase": False}
+    )
 
     # Act: Query the /canpurchase endpoint
     response = test_client.get("/canpurchase", params={"user_id": user_id})
@@ -99,27 +114,21 @@ def test_can_message_disabled(
     """
     Test the /canmessage endpoint when the user is restricted from sending/receiving messages.
     """
-    time.sleep(1)
     # Arrange
     user_id = "user_101"
-    user_manager = RedisUserManager(redis_user)
 
-    # Trigger the ScamMessageRule
+    # Flag two scam messages in a single event to trigger the ScamMessageRule
     event_payload = {
         "name": "scam_message_flagged",
-        "event_properties": {"user_id": user_id},
-    }
-    test_client.post("/event", json=event_payload)
-
-    # Add another scam message to trigger the rule
-    event_payload_2 = {
-        "name": "scam_message_flagged",
-        "event_properties": {"user_id": user_id},
+        "event_properties": {"user_id": user_id, "count": 2},
     }
-    test_client.post("/event", json=event_payload_2)
+    test_client.post("/event", content=orjson.dumps(event_payload), headers=_JSON)
 
-    # Allow time for the consumer to process
-    time.sleep(1)
+    # Wait for the consumer to process
+    assert wait_until(
+        lambda: test_client.get("/canmessage", params={"user_id": user_id}).json()
+        == {"can_message": False}
+    )
 
     # Act: Query the /canmessage endpoint
     response = test_client.get("/canmessage", params={"user_id": user_id})
@@ -1,121 +1,173 @@
-import time
+import asyncio
 
-from feature_restriction.redis_user_manager import RedisUserManager
+import httpx
+import orjson
+import pytest
 
+from app import app
+from feature_restriction.models import AccessFlag
+from tests.helpers import wait_until
 
-def test_unique_zip_code_rule(
-    redis_user, redis_stream, test_client, stream_consumer_subprocess, redis_tripwire
-):
-    """
-    Test if the UniqueZipCodeRule disables 'can_purchase' when the threshold is exceeded.
-    """
-    time.sleep(1)
-    # Arrange
-    user_id = "user_123"
-    user_manager = RedisUserManager(redis_user)
+# Request bodies are serialized once per module instead of on every post
+_JSON = {"content-type": "application/json"}
 
-    # Add an initial credit card
-    event_payload_1 = {
+ZIP_RULE_USER_ID = "user_123"
+CC_EVENT_1 = orjson.dumps(
+    {
         "name": "credit_card_added",
         "event_properties": {
-            "user_id": user_id,
+            "user_id": ZIP_RULE_USER_ID,
             "card_id": "card_001",
             "zip_code": "12345",
         },
     }
-    test_client.post("/event", json=event_payload_1)
-
-    # Add a second credit card with a unique zip code to trigger the rule
-    event_payload_2 = {
+)
+CC_EVENT_2 = orjson.dumps(
+    {
         "name": "credit_card_added",
         "event_properties": {
-            "user_id": user_id,
+            "user_id": ZIP_RULE_USER_ID,
             "card_id": "card_002",
             "zip_code": "54321",
         },
     }
-    test_client.post("/event", json=event_payload_2)
-
-    # Add an initial credit card
-    event_payload_3 = {
+)
+CC_EVENT_3 = orjson.dumps(
+    {
         "name": "credit_card_added",
         "event_properties": {
-            "user_id": user_id,
+            "user_id": ZIP_RULE_USER_ID,
             "card_id": "card_003",
             "zip_code": "45678",
         },
     }
-    test_client.post("/event", json=event_payload_3)
+)
 
-    # Allow time for the consumer to process
-    time.sleep(1)
+SCAM_RULE_USER_ID = "user_456"
+SCAM_EVENT = orjson.dumps(
+    {
+        "name": "scam_message_flagged",
+        "event_properties": {"user_id": SCAM_RULE_USER_ID},
+    }
+)
+
+
+def _access_revoked(user_manager, user_id: str, flag: AccessFlag) -> bool:
+    """
+    Check whether the consumer has saved the user with `flag` removed.
+
+    A user the consumer has not saved yet counts as not revoked.
+    """
+    try:
+        return flag not in user_manager.get_user(user_id).access_flags
+    except KeyError:
+        return False
+
+
+@pytest.mark.asyncio
+async def test_unique_zip_code_rule(
+    redis_user,
+    user_manager,
+    redis_stream,
+    stream_consumer_subprocess,
+    redis_tripwire,
+):
+    """
+    Test if the UniqueZipCodeRule disables 'can_purchase' when the threshold is exceeded.
+    """
+    # Arrange
+    user_id = ZIP_RULE_USER_ID
+
+    # Act: Add three credit cards with unique zip codes concurrently to trigger the rule;
+    # the rule only counts distinct zip codes, so arrival order does not matter
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        responses = await asyncio.gather(
+            *(
+                c.post("/event", content=body, headers=_JSON)
+                for body in (CC_EVENT_1, CC_EVENT_2, CC_EVENT_3)
+            )
+        )
+    assert all(response.status_code == 200 for response in responses)
+
+    # Wait for the consumer to process
+    assert wait_until(
+        lambda: _access_revoked(user_manager, user_id, AccessFlag.can_purchase)
+    )
 
     # Assert
     updated_user_data = user_manager.get_user(user_id)
-    assert updated_user_data.access_flags["can_purchase"] is False
+    assert updated_user_data.total_credit_cards == 3
+    assert AccessFlag.can_purchase not in updated_user_data.access_flags
 
 
 def test_scam_message_rule(
-    redis_user, redis_stream, test_client, stream_consumer_subprocess, redis_tripwire
+    redis_user,
+    user_manager,
+    redis_stream,
+    test_client,
+    stream_consumer_subprocess,
+    redis_tripwire,
 ):
     """
     Test if the ScamMessageRule disables 'can_message' after the scam message flag threshold is reached.
     """
-    time.sleep(1)
     # Arrange
-    user_id = "user_456"
-    user_manager = RedisUserManager(redis_user)
+    user_id = SCAM_RULE_USER_ID
 
     # Flag the first scam message
-    event_payload_1 = {
-        "name": "scam_message_flagged",
-        "event_properties": {"user_id": user_id},
-    }
-    test_client.post("/event", json=event_payload_1)
+    test_client.post("/event", content=SCAM_EVENT, headers=_JSON)
 
     # Flag the second scam message to trigger the rule
-    event_payload_2 = {
-        "name": "scam_message_flagged",
-        "event_properties": {"user_id": user_id},
-    }
-    test_client.post("/event", json=event_payload_2)
+    test_client.post("/event", content=SCAM_EVENT, headers=_JSON)
 
-    # Allow time for the consumer to process
-    time.sleep(1)
+    # Wait for the consumer to process
+    assert wait_until(
+        lambda: _access_revoked(user_manager, user_id, AccessFlag.can_message)
+    )
 
     # Assert
     updated_user_data = user_manager.get_user(user_id)
-    assert updated_user_data.access_flags["can_message"] is False
+    assert updated_user_data.scam_message_flags == 2
+    assert AccessFlag.can_message not in updated_user_data.access_flags
 
 
 def test_chargeback_ratio_rule(
-    redis_user, redis_stream, test_client, stream_consumer_subprocess, redis_tripwire
+    redis_user,
+    user_manager,
+    redis_stream,
+    test_client,
+    stream_consumer_subprocess,
+    redis_tripwire,
 ):
     """
     Test if the ChargebackRatioRule disables 'can_purchase' when the chargeback-to-spend ratio exceeds the limit.
     """
-    time.sleep(1)
     # Arrange
     user_id = "user_789"
-    user_manager = RedisUserManager(redis_user)
-
-    # Add a purchase event to set the spend amount
-    purchase_event = {
-        "name": "purchase_made",
-        "event_properties": {"user_id": user_id, "amount": 100.00},
-    }
-    test_client.post("/event", json=purchase_event)
 
-    # Add a chargeback event to exceed the chargeback ratio threshold
-    chargeback_event = {
-        "name": "chargeback_occurred",
-        "event_properties": {"user_id": user_id, "amount": 15.00},
-    }
-    test_client.post("/event", json=chargeback_event)
+    # Set the spend amount, then exceed the chargeback ratio threshold, in one
+    # batch; the stream keeps the batch order so the purchase is processed first
+    events_payload = [
+        {
+            "name": "purchase_made",
+            "event_properties": {"user_id": user_id, "amount": 100.00},
+        },
+        {
+            "name": "chargeback_occurred",
+            "event_properties": {"user_id": user_id, "amount": 15.00},
+        },
+    ]
+    test_client.post(
+        "/events:batch", content=orjson.dumps(events_payload), headers=_JSON
+    )
 
-    # Allow time for the consumer to process
-    time.sleep(1)
+    # Wait for the consumer to process
+    assert wait_until(
+        lambda: _access_revoked(user_manager, user_id, AccessFlag.can_purchase)
+    )
 
     # Assert
     updated_user_data = user_manager.get_user(user_id)
-    assert updated_user_data.access_flags["can_purchase"] is False
+    assert updated_user_data.total_spend == 100.00
+    assert AccessFlag.can_purchase not in updated_user_data.access_flags
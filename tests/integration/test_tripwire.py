@@ -1,21 +1,44 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from feature_restriction.redis_user_manager import RedisUserManager
-from feature_restriction.tripwire_manager import RedisTripwireManager
+import orjson
 
+from feature_restriction.models import AccessFlag
+from tests.helpers import wait_until
 
-def test_tripwire_disables_rule_when_threshold_exceeded(redis_tripwire):
+# Request bodies are serialized once per module instead of on every post
+_JSON = {"content-type": "application/json"}
+
+STEPWISE_USER_1_ID = "12345"
+STEPWISE_USER_2_ID = "67890"
+SCAM_EVENT_USER_1 = orjson.dumps(
+    {
+        "name": "scam_message_flagged",
+        "event_properties": {"user_id": STEPWISE_USER_1_ID},
+    }
+)
+SCAM_EVENT_USER_2 = orjson.dumps(
+    {
+        "name": "scam_message_flagged",
+        "event_properties": {"user_id": STEPWISE_USER_2_ID},
+    }
+)
+
+
+def test_tripwire_disables_rule_when_threshold_exceeded(
+    redis_tripwire, tripwire_manager
+):
     """
     Test that a rule is disabled via the tripwire when the affected user percentage exceeds the threshold.
     """
     # Arrange
-    tripwire_manager = RedisTripwireManager(redis_tripwire)
     total_users = 100  # Total users in the system
     rule_name = "scam_message_rule"
 
     # Act: Add affected users just below the threshold
-    for i in range(4):  # 4% of 100 users
-        tripwire_manager.apply_tripwire_if_needed(rule_name, f"user_{i}", total_users)
+    tripwire_manager.apply_tripwire_bulk(
+        rule_name, [f"user_{i}" for i in range(4)], total_users  # 4% of 100 users
+    )
 
     # Assert: Rule is not disabled yet
     assert not tripwire_manager.is_rule_disabled_via_tripwire(rule_name)
@@ -28,26 +51,24 @@ def test_tripwire_disables_rule_when_threshold_exceeded(redis_tripwire):
 
     # Assert: Verify Redis storage
     assert redis_tripwire.hget("tripwire:states", rule_name) == "1"
-    affected_users = redis_tripwire.hgetall(f"tripwire:affected_users:{rule_name}")
-    assert len(affected_users) == 5
+    assert redis_tripwire.zcard(f"tripwire:affected_users:{rule_name}") == 5
 
 
-def test_tripwire_removes_expired_users(redis_tripwire):
+def test_tripwire_removes_expired_users(redis_tripwire, tripwire_manager):
     """
     Test that expired affected users are removed from the tripwire's affected user list.
     """
     # Arrange
-    tripwire_manager = RedisTripwireManager(redis_tripwire)
     rule_name = "unique_zip_code_rule"
     total_users = 100
     current_time = time.time()
 
     # Add affected users with timestamps
-    redis_tripwire.hset(
+    redis_tripwire.zadd(
         f"tripwire:affected_users:{rule_name}",
-        mapping={
-            "user_1": str(current_time - 400),  # Expired (400 seconds ago, window=300)
-            "user_2": str(current_time - 200),  # Valid
+        {
+            "user_1": current_time - 400,  # Expired (400 seconds ago, window=300)
+            "user_2": current_time - 200,  # Valid
         },
     )
 
@@ -55,131 +76,152 @@ def test_tripwire_removes_expired_users(redis_tripwire):
     tripwire_manager.apply_tripwire_if_needed(rule_name, "user_3", total_users)
 
     # Assert: Verify expired user is removed
-    affected_users = redis_tripwire.hgetall(f"tripwire:affected_users:{rule_name}")
-    assert "user_1" not in affected_users
-    assert "user_2" in affected_users
-    assert "user_3" in affected_users
+    affected_users_key = f"tripwire:affected_users:{rule_name}"
+    assert redis_tripwire.zscore(affected_users_key, "user_1") is None
+    assert redis_tripwire.zscore(affected_users_key, "user_2") == current_time - 200
+    assert redis_tripwire.zscore(affected_users_key, "user_3") is not None
 
 
-def test_tripwire_reactivates_rule_below_threshold(redis_tripwire):
+def test_tripwire_reactivates_rule_below_threshold(redis_tripwire, tripwire_manager):
     """
     Test that a disabled rule is re-enabled when the percentage of affected users drops below the threshold.
     """
     # Arrange
-    tripwire_manager = RedisTripwireManager(redis_tripwire)
     total_users = 100
     rule_name = "chargeback_ratio_rule"
 
     # Add affected users to exceed the threshold
-    for i in range(6):  # 6% of 100 users
-        tripwire_manager.apply_tripwire_if_needed(rule_name, f"user_{i}", total_users)
+    tripwire_manager.apply_tripwire_bulk(
+        rule_name, [f"user_{i}" for i in range(6)], total_users  # 6% of 100 users
+    )
 
     # Assert: Rule is disabled
     assert tripwire_manager.is_rule_disabled_via_tripwire(rule_name)
 
     # Act: Remove some affected users to drop below the threshold
-    redis_tripwire.hdel(f"tripwire:affected_users:{rule_name}", "user_0")
-    redis_tripwire.hdel(f"tripwire:affected_users:{rule_name}", "user_1")
-    redis_tripwire.hdel(f"tripwire:affected_users:{rule_name}", "user_2")
-    redis_tripwire.hdel(f"tripwire:affected_users:{rule_name}", "user_3")
+    redis_tripwire.zrem(
+        f"tripwire:affected_users:{rule_name}", "user_0", "user_1", "user_2", "user_3"
+    )
     tripwire_manager.apply_tripwire_if_needed(rule_name, "user_7", total_users)
 
     # Assert: Rule is re-enabled
     assert not tripwire_manager.is_rule_disabled_via_tripwire(rule_name)
 
 
+def test_tripwire_concurrent_applies_are_atomic(redis_tripwire, tripwire_manager):
+    """
+    Test that concurrent tripwire updates for one rule neither lose users nor leave a stale state.
+    """
+    # Arrange
+    total_users = 100
+    rule_name = "scam_message_rule"
+    user_ids = [f"user_{i}" for i in range(20)]
+
+    # Act: Apply the tripwire for every user from concurrent workers
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(
+            executor.map(
+                lambda uid: tripwire_manager.apply_tripwire_if_needed(
+                    rule_name, uid, total_users
+                ),
+                user_ids,
+            )
+        )
+
+    # Assert: Every user was recorded and the final state reflects all of them
+    assert redis_tripwire.zcard(f"tripwire:affected_users:{rule_name}") == 20
+    assert tripwire_manager.is_rule_disabled_via_tripwire(rule_name)
+
+
 def test_tripwire_and_rule_integration_stepwise(
-    test_client, redis_stream, redis_user, redis_tripwire, stream_consumer_subprocess
+    test_client,
+    redis_stream,
+    redis_user,
+    user_manager,
+    redis_tripwire,
+    tripwire_manager,
+    stream_consumer_subprocess,
 ):
     """
     Test the integration of rules, tripwire, and access flags via stepwise event posting.
     """
-    time.sleep(1)  # Allow the consumer to start
-    # Simulate the RedisTripwireManager in Redis
-    tripwire_manager = RedisTripwireManager(redis_tripwire)
     # Arrange
-    user_1_id = "12345"
-    user_2_id = "67890"
+    user_1_id = STEPWISE_USER_1_ID
+    user_2_id = STEPWISE_USER_2_ID
     total_users = 100  # Simulate total users in the system
     rule_name = "scam_message_rule"
 
-    # Prepare event payloads
-    event_payload_user_1 = {
-        "name": "scam_message_flagged",
-        "event_properties": {"user_id": user_1_id},
-    }
-    event_payload_user_2 = {
-        "name": "scam_message_flagged",
-        "event_properties": {"user_id": user_2_id},
-    }
+    expected_response = {"status": "Event 'scam_message_flagged' added to the stream."}
+
+    def scam_message_flags(user_id):
+        try:
+            return user_manager.get_user(user_id).scam_message_flags
+        except KeyError:
+            return 0
 
     # Act & Assert: First event for user_1
-    response = test_client.post("/event", json=event_payload_user_1)
+    response = test_client.post("/event", content=SCAM_EVENT_USER_1, headers=_JSON)
     assert response.status_code == 200
-    expected_response = {
-        "status": f"Event '{event_payload_user_1['name']}' added to the stream."
-    }
     assert response.json() == expected_response
 
-    time.sleep(0.5)  # Allow the consumer to process the event
+    # Wait for the consumer to process the event
+    assert wait_until(lambda: scam_message_flags(user_1_id) == 1)
 
     # Assert user_1's access after the first event
-    user_manager = RedisUserManager(redis_user)
     user_1_data = user_manager.get_user(user_1_id)
     assert user_1_data.scam_message_flags == 1  # Only one event processed
-    assert user_1_data.access_flags["can_message"]  # Rule not yet triggered
+    assert AccessFlag.can_message in user_1_data.access_flags  # Rule not yet triggered
 
     # Act & Assert: Second event for user_1 (rule triggers here)
-    response = test_client.post("/event", json=event_payload_user_1)
+    response = test_client.post("/event", content=SCAM_EVENT_USER_1, headers=_JSON)
     assert response.status_code == 200
-    expected_response = {
-        "status": f"Event '{event_payload_user_1['name']}' added to the stream."
-    }
     assert response.json() == expected_response
 
-    time.sleep(0.5)  # Allow the consumer to process the event
+    # The flag count and the restriction are saved in the same write
+    assert wait_until(lambda: scam_message_flags(user_1_id) == 2)
 
     # Assert user_1's access after the second event
     user_1_data = user_manager.get_user(user_1_id)
     assert user_1_data.scam_message_flags == 2  # Rule threshold met
-    assert not user_1_data.access_flags["can_message"]  # Rule disabled access
+    assert (
+        AccessFlag.can_message not in user_1_data.access_flags
+    )  # Rule disabled access
 
     # Act: Add enough users to trip the tripwire
-    for i in range(int(total_users * 0.06)):  # 6% of total users
-        tripwire_manager.apply_tripwire_if_needed(rule_name, f"user_{i}", total_users)
+    tripwire_manager.apply_tripwire_bulk(
+        rule_name,
+        [f"user_{i}" for i in range(int(total_users * 0.06))],  # 6% of total users
+        total_users,
+    )
 
     # Assert: Validate tripwire state (rule is now disabled)
     assert tripwire_manager.is_rule_disabled_via_tripwire(rule_name)
 
     # Act & Assert: First event for user_2
-    response = test_client.post("/event", json=event_payload_user_2)
+    response = test_client.post("/event", content=SCAM_EVENT_USER_2, headers=_JSON)
     assert response.status_code == 200
-    expected_response = {
-        "status": f"Event '{event_payload_user_2['name']}' added to the stream."
-    }
     assert response.json() == expected_response
 
-    time.sleep(0.5)  # Allow the consumer to process the event
+    # Wait for the consumer to process the event
+    assert wait_until(lambda: scam_message_flags(user_2_id) == 1)
 
     # Assert user_2's access after the first event
     user_2_data = user_manager.get_user(user_2_id)
     assert user_2_data.scam_message_flags == 1  # Only one event processed
-    assert user_2_data.access_flags["can_message"]  # Rule not triggered yet
+    assert AccessFlag.can_message in user_2_data.access_flags  # Rule not triggered yet
 
     # Act & Assert: Second event for user_2 (rule would trigger but is disabled by tripwire)
-    response = test_client.post("/event", json=event_payload_user_2)
+    response = test_client.post("/event", content=SCAM_EVENT_USER_2, headers=_JSON)
     assert response.status_code == 200
-    expected_response = {
-        "status": f"Event '{event_payload_user_2['name']}' added to the stream."
-    }
     assert response.json() == expected_response
 
-    time.sleep(0.5)  # Allow the consumer to process the event
+    # Wait for the consumer to process the event
+    assert wait_until(lambda: scam_message_flags(user_2_id) == 2)
 
     # Assert user_2's access after the second event
     user_2_data = user_manager.get_user(user_2_id)
     assert user_2_data.scam_message_flags == 2  # Event count updates
-    assert user_2_data.access_flags["can_message"]  # Access remains enabled
+    assert AccessFlag.can_message in user_2_data.access_flags  # Access remains enabled
 
     # Assert: Check the `canmessage` endpoints for both users
     response = test_client.get(f"/canmessage?user_id={user_1_id}")
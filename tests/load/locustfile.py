@@ -1,17 +1,80 @@
+import itertools
 import random
-import string
-from threading import Lock
+import secrets
 
-from locust import FastHttpUser, constant_pacing, task
+import orjson
+from locust import FastHttpUser, SequentialTaskSet, constant_pacing, task
 
-# Shared list for storing user IDs
-user_ids = []
-user_ids_lock = Lock()
+# Event types sent by send_events, indexed by the constants below
+EVENT_NAMES = ("credit_card_added", "scam_message_flagged", "purchase_made")
+CREDIT_CARD_ADDED, SCAM_MESSAGE_FLAGGED, PURCHASE_MADE = range(len(EVENT_NAMES))
+
+
+def event_templates():
+    """Build one reusable event skeleton per event type."""
+    return [{"name": name, "event_properties": {}} for name in EVENT_NAMES]
+
+
+# User IDs are a per-process random prefix plus a counter: unique across Locust worker
+# processes and much cheaper to produce than a random string per call
+_user_id_prefix = secrets.token_hex(4)
+_user_id_counter = itertools.count()
 
 
 def random_user_id():
-    """Generate a random user ID."""
-    return "".join(random.choices(string.ascii_letters + string.digits, k=8))
+    """Generate a unique user ID."""
+    return f"{_user_id_prefix}{next(_user_id_counter):08x}"
+
+
+class FeatureFlow(SequentialTaskSet):
+    """
+    Writes a few events for a fresh user, then reads that same user's access flags.
+
+    The read always targets a user that was just written to, so no task slot is spent
+    waiting for user IDs to exist.
+    """
+
+    def on_start(self):
+        # Each simulated user owns its event skeletons, so tasks never share them
+        self._events = event_templates()
+        self._json_headers = {"Content-Type": "application/json"}
+        self._uid = None
+
+    @task
+    def a_send_events(self):
+        """Simulate sending one event of each type for a new user to the /event endpoint."""
+        self._uid = random_user_id()
+        for event_type in range(len(EVENT_NAMES)):
+            self._send_event(event_type)
+
+    @task
+    def b_check_access(self):
+        """Simulate checking both access flags of that user via the /access endpoint."""
+        response = self.client.get(f"/access?user_id={self._uid}")
+        assert response.status_code == 200, response.status_code
+        # Check the raw body instead of parsing JSON on every request. Events are
+        # processed asynchronously by the consumer, so the user may not exist yet.
+        body = response.content
+        assert (
+            b'"can_message"' in body and b'"can_purchase"' in body
+        ) or b"No user found" in body, f"Check access failed: {orjson.loads(body)}"
+
+    def _send_event(self, event_type):
+        # Reuse this user's event skeleton and only fill in the per-event fields
+        event = self._events[event_type]
+        event_properties = event["event_properties"]
+        event_properties["user_id"] = self._uid
+        if event_type == CREDIT_CARD_ADDED:
+            event_properties["card_id"] = f"card_{random.randint(1, 100)}"
+            event_properties["zip_code"] = f"{random.randint(10000, 99999)}"
+        elif event_type == PURCHASE_MADE:
+            event_properties["amount"] = round(random.uniform(10, 100), 2)
+        # orjson encodes straight to bytes, skipping the client's json.dumps
+        response = self.client.post(
+            "/event", data=orjson.dumps(event), headers=self._json_headers
+        )
+        if response.status_code != 200:
+            print(f"Event post failed: {response.status_code}, {response.text}")
 
 
 class FeatureRestrictionServiceUser(FastHttpUser):
@@ -22,58 +85,4 @@ class FeatureRestrictionServiceUser(FastHttpUser):
     host = "http://localhost:8000"  # Works with postman POST
     # host = "http://fastapi_app:8000"  # Use the service name defined in Docker Compose
     wait_time = constant_pacing(1 / 2000)  # 1,500 RPS per task
-
-    @task(1)
-    def send_event(self):
-        """Simulate sending an event to the /event endpoint."""
-        user_id = random_user_id()
-        with user_ids_lock:
-            user_ids.append(user_id)
-
-        event_types = [
-            {
-                "name": "credit_card_added",
-                "event_properties": {
-                    "user_id": user_id,
-                    "card_id": f"card_{random.randint(1, 100)}",
-                    "zip_code": f"{random.randint(10000, 99999)}",
-                },
-            },
-            {
-                "name": "scam_message_flagged",
-                "event_properties": {"user_id": user_id},
-            },
-            {
-                "name": "purchase_made",
-                "event_properties": {
-                    "user_id": user_id,
-                    "amount": round(random.uniform(10, 100), 2),
-                },
-            },
-        ]
-        event = random.choice(event_types)
-        response = self.client.post("/event", json=event)
-        if response.status_code != 200:
-            print(f"Event post failed: {response.status_code}, {response.text}")
-
-    @task(1)
-    def check_can_message(self):
-        """Simulate checking the /canmessage endpoint for existing users."""
-        with user_ids_lock:
-            if user_ids:
-                user_id = random.choice(user_ids)
-                response = self.client.get(f"/canmessage?user_id={user_id}")
-                assert (
-                    response.status_code == 200
-                ), f"Check can_message failed: {response.json()}"
-
-    @task(1)
-    def check_can_purchase(self):
-        """Simulate checking the /canpurchase endpoint for existing users."""
-        with user_ids_lock:
-            if user_ids:
-                user_id = random.choice(user_ids)
-                response = self.client.get(f"/canpurchase?user_id={user_id}")
-                assert (
-                    response.status_code == 200
-                ), f"Check can_purchase failed: {response.json()}"
+    tasks = [FeatureFlow]
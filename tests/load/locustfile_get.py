@@ -1,10 +1,12 @@
-import random
-
+import orjson
 import redis
 from locust import FastHttpUser, constant_pacing, task
 
 from feature_restriction.config import REDIS_DB_LOCUST
 
+# Number of user IDs fetched per SRANDMEMBER call
+UID_SAMPLE_SIZE = 256
+
 
 class GetEventsUser(FastHttpUser):
     host = "http://localhost:8000"
@@ -15,28 +17,26 @@ class GetEventsUser(FastHttpUser):
         self.redis_client = redis.StrictRedis(
             host="localhost", port=6379, db=REDIS_DB_LOCUST
         )
+        # Locally cached sample of user IDs, refilled from Redis when exhausted
+        self._uid_cache = []
 
     @task(1)
-    def check_can_message(self):
-        """Simulate checking the /canmessage endpoint for existing users from Redis."""
-        user_id = self._get_random_user_id()
-        if user_id is not None:
-            response = self.client.get(f"/canmessage?user_id={user_id}")
-            assert (
-                response.status_code == 200
-            ), f"Check can_message failed: {response.text}"
-
-    @task(1)
-    def check_can_purchase(self):
-        """Simulate checking the /canpurchase endpoint for existing users from Redis."""
+    def check_access(self):
+        """Simulate checking both access flags via the /access endpoint for existing users from Redis."""
         user_id = self._get_random_user_id()
         if user_id is not None:
-            response = self.client.get(f"/canpurchase?user_id={user_id}")
+            response = self.client.get(f"/access?user_id={user_id}")
+            assert response.status_code == 200, response.status_code
+            # Check the raw body instead of parsing JSON on every request
+            body = response.content
             assert (
-                response.status_code == 200
-            ), f"Check can_purchase failed: {response.text}"
+                b'"can_message"' in body and b'"can_purchase"' in body
+            ), f"Check access returned incomplete flags: {orjson.loads(body)}"
 
     def _get_random_user_id(self):
-        # Use SRANDMEMBER to get a random user_id from the Redis set
-        user_id = self.redis_client.srandmember("locust_user_ids")
-        return user_id.decode("utf-8") if user_id else None
+        # Fetch a batch of random user_ids with one SRANDMEMBER and serve them locally
+        if not self._uid_cache:
+            self._uid_cache = (
+                self.redis_client.srandmember("locust_user_ids", UID_SAMPLE_SIZE) or []
+            )
+        return self._uid_cache.pop().decode("utf-8") if self._uid_cache else None
@@ -1,15 +1,36 @@
+import itertools
 import random
-import string
+import secrets
 
+import orjson
 import redis
 from locust import FastHttpUser, constant_pacing, task
 
 from feature_restriction.config import REDIS_DB_LOCUST
 
+# Number of user IDs buffered before they are written to Redis
+UID_FLUSH_SIZE = 64
+
+
+# Event types sent by send_event, indexed by the constants below
+EVENT_NAMES = ("credit_card_added", "scam_message_flagged", "purchase_made")
+CREDIT_CARD_ADDED, SCAM_MESSAGE_FLAGGED, PURCHASE_MADE = range(len(EVENT_NAMES))
+
+
+def event_templates():
+    """Build one reusable event skeleton per event type."""
+    return [{"name": name, "event_properties": {}} for name in EVENT_NAMES]
+
+
+# User IDs are a per-process random prefix plus a counter: unique across Locust worker
+# processes and much cheaper to produce than a random string per call
+_user_id_prefix = secrets.token_hex(4)
+_user_id_counter = itertools.count()
+
 
 def random_user_id():
-    """Generate a random user ID."""
-    return "".join(random.choices(string.ascii_letters + string.digits, k=8))
+    """Generate a unique user ID."""
+    return f"{_user_id_prefix}{next(_user_id_counter):08x}"
 
 
 class PostEventsUser(FastHttpUser):
@@ -21,38 +42,46 @@ class PostEventsUser(FastHttpUser):
         self.redis_client = redis.StrictRedis(
             host="localhost", port=6379, db=REDIS_DB_LOCUST
         )
+        # Each simulated user owns its event skeletons, so tasks never share them
+        self._events = event_templates()
+        self._json_headers = {"Content-Type": "application/json"}
+        # user_ids of successful posts, written to Redis in batches
+        self._uid_buf = []
+
+    def on_stop(self):
+        # Store whatever is left in the buffer
+        self._flush_user_ids()
 
     @task(1)
     def send_event(self):
         """Simulate sending an event to the /event endpoint and store the user_id in Redis."""
         user_id = random_user_id()
 
-        event_types = [
-            {
-                "name": "credit_card_added",
-                "event_properties": {
-                    "user_id": user_id,
-                    "card_id": f"card_{random.randint(1, 100)}",
-                    "zip_code": f"{random.randint(10000, 99999)}",
-                },
-            },
-            {
-                "name": "scam_message_flagged",
-                "event_properties": {"user_id": user_id},
-            },
-            {
-                "name": "purchase_made",
-                "event_properties": {
-                    "user_id": user_id,
-                    "amount": round(random.uniform(10, 100), 2),
-                },
-            },
-        ]
-        event = random.choice(event_types)
-        response = self.client.post("/event", json=event)
+        # Reuse this user's event skeleton and only fill in the per-event fields
+        event_type = random.randrange(len(EVENT_NAMES))
+        event = self._events[event_type]
+        event_properties = event["event_properties"]
+        event_properties["user_id"] = user_id
+        if event_type == CREDIT_CARD_ADDED:
+            event_properties["card_id"] = f"card_{random.randint(1, 100)}"
+            event_properties["zip_code"] = f"{random.randint(10000, 99999)}"
+        elif event_type == PURCHASE_MADE:
+            event_properties["amount"] = round(random.uniform(10, 100), 2)
+        # orjson encodes straight to bytes, skipping the client's json.dumps
+        response = self.client.post(
+            "/event", data=orjson.dumps(event), headers=self._json_headers
+        )
 
         if response.status_code == 200:
-            # Store user_id in Redis set
-            self.redis_client.sadd("locust_user_ids", user_id)
+            # Buffer the user_id and store the batch in the Redis set once it is full
+            self._uid_buf.append(user_id)
+            if len(self._uid_buf) >= UID_FLUSH_SIZE:
+                self._flush_user_ids()
         else:
             print(f"Event post failed: {response.status_code}, {response.text}")
+
+    def _flush_user_ids(self):
+        # A single variadic SADD stores the whole buffer in one round trip
+        if self._uid_buf:
+            self.redis_client.sadd("locust_user_ids", *self._uid_buf)
+            self._uid_buf.clear()
@@ -0,0 +1,156 @@
+from unittest.mock import MagicMock
+
+import httpx
+import orjson
+import pytest
+
+from app import app, get_event_publisher, get_user_manager
+from feature_restriction.config import EVENT_STREAM_KEY
+from feature_restriction.models import AccessFlag
+from feature_restriction.publisher import RedisEventPublisher
+
+_JSON = {"content-type": "application/json"}
+
+
+@pytest.fixture(scope="module")
+def transport():
+    """
+    Provide one in-process ASGI transport for the module.
+
+    Requests are handed straight to the app, without sockets or the app's startup and
+    shutdown handlers, so no Redis server is needed.
+    """
+    return httpx.ASGITransport(app=app)
+
+
+@pytest.fixture
+def app_redis(mock_redis, user_manager):
+    """
+    Inject a publisher and user manager backed by this test's own Redis mocks.
+
+    The overrides replace the app's dependencies for this test only, so tests share
+    no state and can run in parallel under pytest-xdist.
+    """
+    app.dependency_overrides[get_event_publisher] = lambda: RedisEventPublisher(
+        mock_redis["stream"]
+    )
+    app.dependency_overrides[get_user_manager] = lambda: user_manager
+    yield mock_redis
+    app.dependency_overrides.clear()
+
+
+async def _request(transport, method, url, **kwargs):
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        return await c.request(method, url, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_handle_event(transport, app_redis):
+    """
+    Test that a valid event posted to /event is added to the stream.
+    """
+    body = orjson.dumps(
+        {
+            "name": "purchase_made",
+            "event_properties": {"user_id": "test_user", "amount": 100.0},
+        }
+    )
+
+    response = await _request(transport, "POST", "/event", content=body, headers=_JSON)
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "Event 'purchase_made' added to the stream."}
+    app_redis["stream"].xadd.assert_called_once()
+    assert app_redis["stream"].xadd.call_args.args[0] == EVENT_STREAM_KEY
+
+
+@pytest.mark.asyncio
+async def test_handle_event_missing_user_id(transport, app_redis):
+    """
+    Test that an event without a user_id is rejected with a 400 and never reaches the stream.
+    """
+    body = orjson.dumps(
+        {"name": "purchase_made", "event_properties": {"amount": 100.0}}
+    )
+
+    response = await _request(transport, "POST", "/event", content=body, headers=_JSON)
+
+    assert response.status_code == 400
+    assert "Validation error" in response.json()["detail"]
+    app_redis["stream"].xadd.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_events_batch(transport, app_redis):
+    """
+    Test that a batch posted to /events:batch is written with a single pipeline execute.
+    """
+    body = orjson.dumps(
+        [
+            {
+                "name": "purchase_made",
+                "event_properties": {"user_id": "test_user", "amount": 100.0},
+            },
+            {
+                "name": "scam_message_flagged",
+                "event_properties": {"user_id": "test_user"},
+            },
+        ]
+    )
+
+    response = await _request(
+        transport, "POST", "/events:batch", content=body, headers=_JSON
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "2 events added to the stream."}
+    pipeline = app_redis["stream"].pipeline.return_value
+    assert pipeline.xadd.call_count == 2
+    pipeline.execute.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_can_message(transport, app_redis, user_manager, sample_user_data):
+    """
+    Test that /canmessage returns the user's messaging flag.
+    """
+    user_manager.get_user = MagicMock(return_value=sample_user_data)
+
+    response = await _request(
+        transport, "GET", "/canmessage", params={"user_id": "test_user"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"can_message": True}
+    user_manager.get_user.assert_called_once_with("test_user")
+
+
+@pytest.mark.asyncio
+async def test_can_purchase_user_not_found(transport, app_redis, user_manager):
+    """
+    Test that /canpurchase reports an unknown user instead of failing.
+    """
+    user_manager.get_user = MagicMock(side_effect=KeyError("missing_user"))
+
+    response = await _request(
+        transport, "GET", "/canpurchase", params={"user_id": "missing_user"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"error": "No user found with ID 'missing_user'"}
+
+
+@pytest.mark.asyncio
+async def test_access(transport, app_redis, user_manager, sample_user_data):
+    """
+    Test that /access returns every access flag of the user.
+    """
+    sample_user_data.access_flags = AccessFlag.can_message
+    user_manager.get_user = MagicMock(return_value=sample_user_data)
+
+    response = await _request(
+        transport, "GET", "/access", params={"user_id": "test_user"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"can_message": True, "can_purchase": False}
@@ -0,0 +1,26 @@
+import redis
+
+from feature_restriction.clients import RedisStreamClient
+from feature_restriction.config import REDIS_MAX_CONNECTIONS
+
+
+def test_connect_reuses_client():
+    """
+    Test that connecting twice returns the same Redis client.
+    """
+    client = RedisStreamClient("localhost", 6379, 1)
+
+    assert client.connect() is client.connect()
+
+
+def test_connect_uses_bounded_blocking_pool():
+    """
+    Test that the Redis client draws on a bounded, blocking connection pool.
+    """
+    connection = RedisStreamClient("localhost", 6379, 1).connect()
+
+    pool = connection.connection_pool
+    assert isinstance(pool, redis.BlockingConnectionPool)
+    assert pool.max_connections == REDIS_MAX_CONNECTIONS
+    assert pool.connection_kwargs["db"] == 1
+    assert pool.connection_kwargs["decode_responses"] is True
@@ -3,9 +3,7 @@ from unittest.mock import MagicMock
 import pytest
 from fastapi import HTTPException
 
-from feature_restriction.endpoint_access import RedisEndpointAccess
-from feature_restriction.models import UserData
-from feature_restriction.redis_user_manager import RedisUserManager
+from feature_restriction.models import AccessFlag, UserData
 
 
 def test_check_access_success(endpoint_access, user_manager):
@@ -20,7 +18,7 @@ def test_check_access_success(endpoint_access, user_manager):
         unique_zip_codes={"12345"},
         total_spend=100.0,
         total_chargebacks=5.0,
-        access_flags={"can_message": True},
+        access_flags=AccessFlag.can_message,
     )
     user_manager.get_user = MagicMock(return_value=user_data)
 
@@ -36,7 +34,7 @@ def test_check_access_no_access_key(endpoint_access, user_manager):
     # Arrange
     user_id = "user123"
     access_key = "can_purchase"
-    # User doesn't have "can_purchase" key
+    # User doesn't have the "can_purchase" flag set
     user_data = UserData(
         user_id=user_id,
         scam_message_flags=1,
@@ -45,7 +43,7 @@ def test_check_access_no_access_key(endpoint_access, user_manager):
         unique_zip_codes={"12345"},
         total_spend=100.0,
         total_chargebacks=5.0,
-        access_flags={"can_message": True},
+        access_flags=AccessFlag.can_message,
     )
     user_manager.get_user = MagicMock(return_value=user_data)
 
@@ -53,10 +51,23 @@ def test_check_access_no_access_key(endpoint_access, user_manager):
     result = endpoint_access.check_access(user_id, access_key)
 
     # Assert
-    assert result == {"can_purchase": None}
+    assert result == {"can_purchase": False}
     user_manager.get_user.assert_called_once_with(user_id)
 
 
+def test_check_access_unknown_access_key(
+    endpoint_access, user_manager, sample_user_data
+):
+    # Arrange
+    user_manager.get_user = MagicMock(return_value=sample_user_data)
+
+    # Act
+    result = endpoint_access.check_access("test_user", "can_teleport")
+
+    # Assert
+    assert result == {"can_teleport": None}
+
+
 def test_check_access_user_not_found(endpoint_access, user_manager):
     # Arrange
     user_id = "user_not_found"
@@ -86,3 +97,42 @@ def test_check_access_unexpected_error(endpoint_access, user_manager):
     assert exc.value.status_code == 500
     assert "An unexpected error occurred." in exc.value.detail
     user_manager.get_user.assert_called_once_with(user_id)
+
+
+def test_check_all_access_success(endpoint_access, user_manager, sample_user_data):
+    # Arrange
+    sample_user_data.access_flags = AccessFlag.can_message
+    user_manager.get_user = MagicMock(return_value=sample_user_data)
+
+    # Act
+    result = endpoint_access.check_all_access("test_user")
+
+    # Assert
+    assert result == {"can_message": True, "can_purchase": False}
+    user_manager.get_user.assert_called_once_with("test_user")
+
+
+def test_check_all_access_user_not_found(endpoint_access, user_manager):
+    # Arrange
+    user_id = "user_not_found"
+    user_manager.get_user = MagicMock(side_effect=KeyError("User not found"))
+
+    # Act
+    result = endpoint_access.check_all_access(user_id)
+
+    # Assert
+    assert result == {"error": f"No user found with ID '{user_id}'"}
+
+
+def test_check_all_access_unexpected_error(endpoint_access, user_manager):
+    # Arrange
+    user_manager.get_user = MagicMock(
+        side_effect=Exception("Database connection error")
+    )
+
+    # Act & Assert
+    with pytest.raises(HTTPException) as exc:
+        endpoint_access.check_all_access("user123")
+
+    assert exc.value.status_code == 500
+    assert "An unexpected error occurred." in exc.value.detail
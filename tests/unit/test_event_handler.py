@@ -8,29 +8,20 @@ from feature_restriction.event_handlers import (
     PurchaseMadeHandler,
     ScamMessageFlaggedHandler,
 )
-from feature_restriction.models import Event, UserData
-from feature_restriction.rules import (
-    ChargebackRatioRule,
-    ScamMessageRule,
-    UniqueZipCodeRule,
-)
+from feature_restriction.models import Event
 
 
-def test_credit_card_added_handler(user_manager, tripwire_manager, sample_user_data):
+def test_credit_card_added_handler(
+    user_manager, tripwire_manager, sample_user_data, credit_card_event
+):
     """
     Test the CreditCardAddedHandler for handling 'credit_card_added' events.
     """
-    # Arrange
-    event = Event(
-        name="credit_card_added",
-        event_properties={"card_id": "card_002", "zip_code": "54321"},
-    )
-
     # Instantiate the handler
     handler = CreditCardAddedHandler(user_manager)
 
     # Act
-    handler.handle(event, sample_user_data)
+    handler.handle(credit_card_event, sample_user_data)
 
     # Assert: Check the state of `sample_user_data`
     assert sample_user_data.credit_cards == {
@@ -41,57 +32,94 @@ def test_credit_card_added_handler(user_manager, tripwire_manager, sample_user_d
     assert "54321" in sample_user_data.unique_zip_codes
 
 
-def test_scam_message_flagged_handler(user_manager, tripwire_manager, sample_user_data):
+def test_scam_message_flagged_handler(
+    user_manager, tripwire_manager, sample_user_data, scam_message_event
+):
     """
     Test the ScamMessageFlaggedHandler for handling 'scam_message_flagged' events.
     """
     # Arrange
-    event = Event(name="scam_message_flagged", event_properties={})
     user_manager.save_user = MagicMock()
-    scam_message_rule = ScamMessageRule(tripwire_manager, user_manager)
-    scam_message_rule.process_rule = MagicMock()
     handler = ScamMessageFlaggedHandler(user_manager)
 
     # Act
-    handler.handle(event, sample_user_data)
+    handler.handle(scam_message_event, sample_user_data)
 
     # Assert
     assert sample_user_data.scam_message_flags == 2
 
 
-def test_chargeback_occurred_handler(user_manager, tripwire_manager, sample_user_data):
+def test_scam_message_flagged_handler_with_count(user_manager, sample_user_data):
+    """
+    Test that a 'scam_message_flagged' event with a count adds all of its flags at once.
+    """
+    # Arrange
+    event = Event(name="scam_message_flagged", event_properties={"count": 3})
+    user_manager.save_user = MagicMock()
+    handler = ScamMessageFlaggedHandler(user_manager)
+
+    # Act
+    handler.handle(event, sample_user_data)
+
+    # Assert
+    assert sample_user_data.scam_message_flags == 4
+    # Saving is left to the stream consumer
+    user_manager.save_user.assert_not_called()
+
+
+@pytest.mark.parametrize("count", [0, -1, "2", 1.5, True])
+def test_scam_message_flagged_handler_invalid_count(
+    user_manager, sample_user_data, count
+):
+    """
+    Test that a 'scam_message_flagged' event with an invalid count raises a ValueError.
+    """
+    # Arrange
+    event = Event(name="scam_message_flagged", event_properties={"count": count})
+    user_manager.save_user = MagicMock()
+    handler = ScamMessageFlaggedHandler(user_manager)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="'count' must be a positive integer."):
+        handler.handle(event, sample_user_data)
+    assert sample_user_data.scam_message_flags == 1
+    user_manager.save_user.assert_not_called()
+
+
+def test_chargeback_occurred_handler(
+    user_manager, tripwire_manager, sample_user_data, chargeback_event
+):
     """
     Test the ChargebackOccurredHandler for handling 'chargeback_occurred' events.
     """
     # Arrange
-    event = Event(name="chargeback_occurred", event_properties={"amount": 50.0})
     user_manager.save_user = MagicMock()
-    chargeback_ratio_rule = ChargebackRatioRule(tripwire_manager, user_manager)
-    chargeback_ratio_rule.process_rule = MagicMock()
     handler = ChargebackOccurredHandler(user_manager)
 
     # Act
-    handler.handle(event, sample_user_data)
+    handler.handle(chargeback_event, sample_user_data)
 
     # Assert
     assert sample_user_data.total_chargebacks == 55.0
 
 
-def test_purchase_made_handler(user_manager, tripwire_manager, sample_user_data):
+def test_purchase_made_handler(
+    user_manager, tripwire_manager, sample_user_data, purchase_event
+):
     """
     Test the PurchaseMadeHandler for handling 'purchase_made' events.
     """
     # Arrange
-    event = Event(name="purchase_made", event_properties={"amount": 100.0})
     user_manager.save_user = MagicMock()
     handler = PurchaseMadeHandler(user_manager)
 
     # Act
-    handler.handle(event, sample_user_data)
+    handler.handle(purchase_event, sample_user_data)
 
     # Assert
     assert sample_user_data.total_spend == 200.0
-    user_manager.save_user.assert_called_once_with(sample_user_data)
+    # Saving is left to the stream consumer
+    user_manager.save_user.assert_not_called()
 
 
 def test_credit_card_added_handler_missing_properties(
@@ -137,3 +165,22 @@ def test_purchase_made_handler_missing_amount(
     # Act & Assert
     with pytest.raises(ValueError, match="'amount' is required."):
         handler.handle(event, sample_user_data)
+
+
+@pytest.mark.parametrize(
+    "handler_cls",
+    [
+        CreditCardAddedHandler,
+        ScamMessageFlaggedHandler,
+        ChargebackOccurredHandler,
+        PurchaseMadeHandler,
+    ],
+)
+def test_handlers_use_slots(user_manager, handler_cls):
+    """
+    Test that the default handlers keep their state in slots instead of a __dict__.
+    """
+    handler = handler_cls(user_manager)
+
+    assert not hasattr(handler, "__dict__")
+    assert handler.user_manager is user_manager
@@ -1,41 +1,44 @@
-from unittest.mock import MagicMock, patch
-
 import pytest
 from fastapi import HTTPException
 
+from feature_restriction.config import EVENT_STREAM_KEY
 from feature_restriction.models import Event
 
 
-def test_add_event_to_stream_success(event_publisher, mock_redis, valid_event):
+def test_add_event_to_stream_success(event_publisher, fake_redis_stream, valid_event):
     """
     Test adding a valid event to the Redis stream successfully.
     """
     # Call the method
     response = event_publisher.add_event_to_stream(valid_event)
 
-    # Assert the Redis xadd method was called correctly
-    mock_redis["stream"].xadd.assert_called_once()
+    # Assert exactly one entry was written to the stream
+    assert fake_redis_stream.xlen(EVENT_STREAM_KEY) == 1
     assert "status" in response
     assert response["status"] == f"Event '{valid_event.name}' added to the stream."
 
 
-def test_add_event_to_stream_missing_fields(event_publisher):
+def test_add_event_to_stream_missing_fields(event_publisher, fake_redis_stream):
     """
     Test adding an event with missing fields raises a ValueError.
+
+    The invalid events in this module are built with `model_construct`, so only the
+    publisher's own validation runs.
     """
-    invalid_event = Event(name="", event_properties={})
+    invalid_event = Event.model_construct(name="", event_properties={})
     with pytest.raises(HTTPException) as exc_info:
         event_publisher.add_event_to_stream(invalid_event)
 
     assert exc_info.value.status_code == 400
     assert "Event is missing required fields" in str(exc_info.value.detail)
+    assert fake_redis_stream.xlen(EVENT_STREAM_KEY) == 0
 
 
 def test_add_event_to_stream_invalid_user_id(event_publisher):
     """
     Test adding an event with an invalid user_id raises a validation error.
     """
-    invalid_event = Event(
+    invalid_event = Event.model_construct(
         name="credit_card_added", event_properties={"card_id": "card_001"}
     )
     with pytest.raises(HTTPException) as exc_info:
@@ -45,12 +48,18 @@ def test_add_event_to_stream_invalid_user_id(event_publisher):
     assert "Validation error" in str(exc_info.value.detail)
 
 
-def test_add_event_to_stream_redis_error(event_publisher, mock_redis, valid_event):
+def test_add_event_to_stream_redis_error(
+    event_publisher, fake_redis_stream, valid_event, monkeypatch
+):
     """
     Test handling a Redis error when adding an event to the stream.
     """
+
     # Simulate a Redis error
-    mock_redis["stream"].xadd.side_effect = Exception("Redis connection error")
+    def failing_xadd(*args, **kwargs):
+        raise Exception("Redis connection error")
+
+    monkeypatch.setattr(fake_redis_stream, "xadd", failing_xadd)
 
     with pytest.raises(HTTPException) as exc_info:
         event_publisher.add_event_to_stream(valid_event)
@@ -59,9 +68,7 @@ def test_add_event_to_stream_redis_error(event_publisher, mock_redis, valid_even
     assert "Unexpected error occurred while adding event" in str(exc_info.value.detail)
 
 
-def test_add_event_to_stream_logs_event(
-    event_publisher, mock_redis, valid_event, caplog
-):
+def test_add_event_to_stream_logs_event(event_publisher, valid_event, caplog):
     """
     Test that the event is logged when added successfully.
     """
@@ -69,3 +76,70 @@ def test_add_event_to_stream_logs_event(
 
     assert f"Received event: {valid_event}" in caplog.text
     assert "Added event to Redis stream" in caplog.text
+
+
+def test_add_events_to_stream_success(
+    event_publisher, fake_redis_stream, valid_event, purchase_event
+):
+    """
+    Test adding a batch of events writes every event to the stream, in order.
+    """
+    response = event_publisher.add_events_to_stream([valid_event, purchase_event])
+
+    events = fake_redis_stream.xrange(EVENT_STREAM_KEY)
+    assert [event_data["name"] for _, event_data in events] == [
+        "credit_card_added",
+        "purchase_made",
+    ]
+    assert response == {"status": "2 events added to the stream."}
+
+
+def test_add_events_to_stream_empty_batch(event_publisher, fake_redis_stream):
+    """
+    Test adding an empty batch raises a 400 without touching Redis.
+    """
+    with pytest.raises(HTTPException) as exc_info:
+        event_publisher.add_events_to_stream([])
+
+    assert exc_info.value.status_code == 400
+    assert "Event batch is empty" in str(exc_info.value.detail)
+    assert fake_redis_stream.xlen(EVENT_STREAM_KEY) == 0
+
+
+def test_add_events_to_stream_invalid_event(
+    event_publisher, fake_redis_stream, valid_event
+):
+    """
+    Test that one invalid event rejects the whole batch before anything is written.
+    """
+    invalid_event = Event.model_construct(
+        name="credit_card_added", event_properties={"card_id": "card_001"}
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        event_publisher.add_events_to_stream([valid_event, invalid_event])
+
+    assert exc_info.value.status_code == 400
+    assert "Validation error" in str(exc_info.value.detail)
+    assert fake_redis_stream.xlen(EVENT_STREAM_KEY) == 0
+
+
+def test_add_events_to_stream_redis_error(
+    event_publisher, fake_redis_stream, valid_event, monkeypatch
+):
+    """
+    Test handling a Redis error when executing the batch pipeline.
+    """
+    pipeline = fake_redis_stream.pipeline(transaction=False)
+
+    def failing_execute(*args, **kwargs):
+        raise Exception("Redis connection error")
+
+    monkeypatch.setattr(pipeline, "execute", failing_execute)
+    monkeypatch.setattr(fake_redis_stream, "pipeline", lambda transaction: pipeline)
+
+    with pytest.raises(HTTPException) as exc_info:
+        event_publisher.add_events_to_stream([valid_event])
+
+    assert exc_info.value.status_code == 500
+    assert "Unexpected error occurred while adding events" in str(exc_info.value.detail)
+    assert fake_redis_stream.xlen(EVENT_STREAM_KEY) == 0
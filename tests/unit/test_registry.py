@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock
+import sys
+from types import SimpleNamespace
 
 import pytest
 
@@ -8,64 +9,53 @@ from feature_restriction.event_handlers import (
     PurchaseMadeHandler,
     ScamMessageFlaggedHandler,
 )
-from feature_restriction.registry import EventHandlerRegistry
+from feature_restriction.registry import EventHandlerRegistry, RuleRegistry
+from feature_restriction.rules import (
+    ChargebackRatioRule,
+    ScamMessageRule,
+    UniqueZipCodeRule,
+)
 
 
-def test_register_success(event_registry):
+def test_register_handler_success(event_registry):
     """
     Test successful registration of an event handler.
     """
-    mock_handler = MagicMock()
-    mock_handler.event_name = "test_event"
-    event_registry.register(mock_handler)
-
-    assert event_registry.get("test_event") is mock_handler
-
-
-def test_register_with_valid_handler():
-    registry = EventHandlerRegistry()
+    stub_handler = SimpleNamespace(event_name="test_event")
+    event_registry.register(stub_handler)
 
-    # Create a mock event handler with the required 'event_name' attribute
-    mock_handler = MagicMock()
-    mock_handler.event_name = "test_event"
+    assert event_registry.get("test_event") is stub_handler
 
-    # Register the mock handler
-    registry.register(mock_handler)
 
-    # Assert that the handler is registered correctly
-    assert registry.get("test_event") == mock_handler
-
-
-def test_register_with_duplicate_event_name():
-    registry = EventHandlerRegistry()
-
-    # Create two mock event handlers with the same 'event_name'
-    mock_handler_1 = MagicMock()
-    mock_handler_1.event_name = "test_event"
-    mock_handler_2 = MagicMock()
-    mock_handler_2.event_name = "test_event"
+def test_register_duplicate_event_name(event_registry):
+    """
+    Test registering multiple handlers with the same 'event_name' raises an error.
+    """
+    stub_handler1 = SimpleNamespace(event_name="test_event")
+    stub_handler2 = SimpleNamespace(event_name="test_event")
 
-    # Register the first handler
-    registry.register(mock_handler_1)
+    event_registry.register(stub_handler1)
 
-    # Attempt to register the second handler with the same event_name should raise ValueError
     with pytest.raises(ValueError, match="Duplicate event name detected"):
-        registry.register(mock_handler_2)
+        event_registry.register(stub_handler2)
 
 
-def test_register_duplicate_event_name(event_registry):
+def test_register_interns_names(event_registry):
     """
-    Test registering multiple handlers with the same 'event_name' raises an error.
+    Test that event and rule names are interned when a handler is registered.
     """
-    mock_handler1 = MagicMock()
-    mock_handler1.event_name = "test_event"
-    mock_handler2 = MagicMock()
-    mock_handler2.event_name = "test_event"
-
-    event_registry.register(mock_handler1)
+    # Build the names at runtime so they start out as distinct, non-interned strings
+    event_name = "".join(["test", "_event"])
+    rule_name = "".join(["test", "_rule"])
+    event_registry.register(
+        SimpleNamespace(event_name=event_name), rule_names=[rule_name]
+    )
 
-    with pytest.raises(ValueError, match="is already registered"):
-        event_registry.register(mock_handler2)
+    (registered_name,) = event_registry.event_handler_registry
+    assert registered_name is sys.intern("test_event")
+    assert event_registry.get_rules_for_event("test_event")[0] is sys.intern(
+        "test_rule"
+    )
 
 
 def test_get_not_found(event_registry):
@@ -76,11 +66,11 @@ def test_get_not_found(event_registry):
     assert handler is None
 
 
-def test_register_default(event_registry, tripwire_manager, user_manager):
+def test_register_default_handlers(event_registry, user_manager):
     """
     Test registering default event handlers.
     """
-    event_registry.register_default(tripwire_manager, user_manager)
+    event_registry.register_default(user_manager)
 
     # Verify each handler is registered
     assert isinstance(event_registry.get("credit_card_added"), CreditCardAddedHandler)
@@ -96,33 +86,25 @@ def test_register_default(event_registry, tripwire_manager, user_manager):
 
     # Verify handlers are initialized with correct dependencies
     handler = event_registry.get("credit_card_added")
-    assert handler.tripwire_manager == tripwire_manager
-    assert handler.user_manager == user_manager
-
-
-from unittest.mock import MagicMock
+    assert handler.user_manager is user_manager
 
-import pytest
-
-from feature_restriction.registry import RuleRegistry
-from feature_restriction.rules import (
-    ChargebackRatioRule,
-    ScamMessageRule,
-    UniqueZipCodeRule,
-)
+    # Verify each event is mapped to its rules
+    assert event_registry.get_rules_for_event("credit_card_added") == [
+        "unique_zip_code_rule"
+    ]
+    assert event_registry.get_rules_for_event("purchase_made") == []
 
 
-def test_register_success():
+def test_register_rule_success():
     """
     Test successful registration of a rule.
     """
     rule_registry = RuleRegistry()
-    mock_rule = MagicMock()
-    mock_rule.name = "test_rule"
+    stub_rule = SimpleNamespace(name="test_rule")
 
-    rule_registry.register(mock_rule)
+    rule_registry.register(stub_rule)
 
-    assert rule_registry.get("test_rule") == mock_rule
+    assert rule_registry.get("test_rule") == stub_rule
 
 
 def test_register_with_duplicate_name():
@@ -131,15 +113,13 @@ def test_register_with_duplicate_name():
     """
     rule_registry = RuleRegistry()
 
-    mock_rule_1 = MagicMock()
-    mock_rule_1.name = "test_rule"
-    mock_rule_2 = MagicMock()
-    mock_rule_2.name = "test_rule"
+    stub_rule_1 = SimpleNamespace(name="test_rule")
+    stub_rule_2 = SimpleNamespace(name="test_rule")
 
-    rule_registry.register(mock_rule_1)
+    rule_registry.register(stub_rule_1)
 
     with pytest.raises(ValueError, match="is already registered"):
-        rule_registry.register(mock_rule_2)
+        rule_registry.register(stub_rule_2)
 
 
 def test_get_rule_not_found():
@@ -151,7 +131,7 @@ def test_get_rule_not_found():
     assert rule is None
 
 
-def test_register_default(tripwire_manager, user_manager):
+def test_register_default_rules(tripwire_manager, user_manager):
     """
     Test registering default rules.
     """
@@ -1,14 +1,11 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
 
-import pytest
-
-from feature_restriction.models import UserData
+from feature_restriction.models import AccessFlag
 from feature_restriction.rules import (
     ChargebackRatioRule,
     ScamMessageRule,
     UniqueZipCodeRule,
 )
-from feature_restriction.tripwire_manager import RedisTripwireManager
 
 
 def test_unique_zip_code_rule_evaluation_passes(
@@ -52,7 +49,7 @@ def test_unique_zip_code_rule_application(
     rule = UniqueZipCodeRule(tripwire_manager, user_manager)
     rule.apply_rule(sample_user_data)
 
-    assert sample_user_data.access_flags["can_purchase"] is False
+    assert AccessFlag.can_purchase not in sample_user_data.access_flags
 
 
 def test_scam_message_rule_evaluation_passes(
@@ -87,7 +84,7 @@ def test_scam_message_rule_application(
     rule = ScamMessageRule(tripwire_manager, user_manager)
     rule.apply_rule(sample_user_data)
 
-    assert sample_user_data.access_flags["can_message"] is False
+    assert AccessFlag.can_message not in sample_user_data.access_flags
 
 
 def test_chargeback_ratio_rule_evaluation_passes(
@@ -125,22 +122,22 @@ def test_chargeback_ratio_rule_application(
     rule = ChargebackRatioRule(tripwire_manager, user_manager)
     rule.apply_rule(sample_user_data)
 
-    assert sample_user_data.access_flags["can_purchase"] is False
+    assert AccessFlag.can_purchase not in sample_user_data.access_flags
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=True)
 def test_unique_zip_code_rule_process_disabled(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=True)
     rule = UniqueZipCodeRule(tripwire_manager, user_manager)
     result = rule.process_rule(sample_user_data)
     assert result is False
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=False)
 def test_unique_zip_code_rule_process_not_applied(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=False)
     rule = UniqueZipCodeRule(tripwire_manager, user_manager)
     # Fail evaluation by setting total_credit_cards <= 2
     sample_user_data.total_credit_cards = 2
@@ -149,10 +146,10 @@ def test_unique_zip_code_rule_process_not_applied(
     assert result is None
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=False)
 def test_unique_zip_code_rule_process_applied(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=False)
     user_manager.save_user = MagicMock()
     rule = UniqueZipCodeRule(tripwire_manager, user_manager)
     # Pass evaluation by having enough unique zips and total_credit_cards > 2
@@ -161,23 +158,24 @@ def test_unique_zip_code_rule_process_applied(
 
     result = rule.process_rule(sample_user_data)
     assert result is True
-    user_manager.save_user.assert_called_once_with(sample_user_data)
-    assert sample_user_data.access_flags["can_purchase"] is False
+    # Saving is left to the stream consumer
+    user_manager.save_user.assert_not_called()
+    assert AccessFlag.can_purchase not in sample_user_data.access_flags
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=True)
 def test_scam_message_rule_process_disabled(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=True)
     rule = ScamMessageRule(tripwire_manager, user_manager)
     result = rule.process_rule(sample_user_data)
     assert result is False
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=False)
 def test_scam_message_rule_process_not_applied(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=False)
     rule = ScamMessageRule(tripwire_manager, user_manager)
     # Fail evaluation by having scam_message_flags < 2
     sample_user_data.scam_message_flags = 1
@@ -186,10 +184,10 @@ def test_scam_message_rule_process_not_applied(
     assert result is None
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=False)
 def test_scam_message_rule_process_applied(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=False)
     user_manager.save_user = MagicMock()
     rule = ScamMessageRule(tripwire_manager, user_manager)
     # Pass evaluation by having scam_message_flags >= 2
@@ -197,23 +195,24 @@ def test_scam_message_rule_process_applied(
 
     result = rule.process_rule(sample_user_data)
     assert result is True
-    user_manager.save_user.assert_called_once_with(sample_user_data)
-    assert sample_user_data.access_flags["can_message"] is False
+    # Saving is left to the stream consumer
+    user_manager.save_user.assert_not_called()
+    assert AccessFlag.can_message not in sample_user_data.access_flags
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=True)
 def test_chargeback_ratio_rule_process_disabled(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=True)
     rule = ChargebackRatioRule(tripwire_manager, user_manager)
     result = rule.process_rule(sample_user_data)
     assert result is False
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=False)
 def test_chargeback_ratio_rule_process_not_applied(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=False)
     rule = ChargebackRatioRule(tripwire_manager, user_manager)
     # Fail evaluation by having ratio <= 0.10
     sample_user_data.total_spend = 100.0
@@ -223,10 +222,10 @@ def test_chargeback_ratio_rule_process_not_applied(
     assert result is None
 
 
-@patch.object(RedisTripwireManager, "is_rule_disabled_via_tripwire", return_value=False)
 def test_chargeback_ratio_rule_process_applied(
-    mock_tripwire, tripwire_manager, user_manager, sample_user_data
+    tripwire_manager, user_manager, sample_user_data
 ):
+    tripwire_manager.is_rule_disabled_via_tripwire = MagicMock(return_value=False)
     user_manager.save_user = MagicMock()
     rule = ChargebackRatioRule(tripwire_manager, user_manager)
     # Pass evaluation by having ratio > 0.10
@@ -235,5 +234,6 @@ def test_chargeback_ratio_rule_process_applied(
 
     result = rule.process_rule(sample_user_data)
     assert result is True
-    user_manager.save_user.assert_called_once_with(sample_user_data)
-    assert sample_user_data.access_flags["can_purchase"] is False
+    # Saving is left to the stream consumer
+    user_manager.save_user.assert_not_called()
+    assert AccessFlag.can_purchase not in sample_user_data.access_flags
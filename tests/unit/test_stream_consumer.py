@@ -1,19 +1,17 @@
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-from feature_restriction.config import CONSUMER_GROUP, EVENT_STREAM_KEY
-from feature_restriction.models import Event
-from stream_consumer import RedisStreamConsumer
-
 
 def test_process_event_with_registered_handler(
-    stream_consumer, user_manager, sample_user_data
+    stream_consumer, user_manager, sample_user_data, valid_event
 ):
     """
     Test processing an event with a registered handler.
     """
-    # Mock the event handler
-    mock_handler = MagicMock()
-    stream_consumer.event_registry.get = MagicMock(return_value=mock_handler)
+    # Stub event handler recording the arguments of each call
+    calls = []
+    stub_handler = SimpleNamespace(handle=lambda *args: calls.append(args))
+    stream_consumer.event_registry.get = MagicMock(return_value=stub_handler)
 
     # Mock user retrieval
     with patch.object(
@@ -31,21 +29,14 @@ def test_process_event_with_registered_handler(
             stream_consumer.process_event("event_id_1", event_data)
 
             # Verify handler was invoked
-            mock_handler.handle.assert_called_once_with(
-                Event(
-                    name="credit_card_added",
-                    event_properties={
-                        "user_id": "test_user",
-                        "card_id": "card_001",
-                        "zip_code": "12345",
-                    },
-                ),
-                sample_user_data,
-            )
+            assert calls == [(valid_event, sample_user_data)]
+
+            # Verify the user is saved exactly once, after the handler and rules ran
+            mock_save_user.assert_called_once_with(sample_user_data)
 
             # Verify user retrieval calls
-            assert mock_get_user.call_count == 4  # 3 of these for display
-            mock_get_user.assert_called_with("test_user")
+            # One lookup per event; the debug displays reuse the fetched user data
+            mock_get_user.assert_called_once_with("test_user")
 
 
 def test_process_event_creates_user_if_not_found(
@@ -69,6 +60,68 @@ def test_process_event_creates_user_if_not_found(
             user_manager.create_user.assert_called_once_with("test_user")
 
 
+def test_process_event_skips_user_dumps_when_debug_disabled(
+    stream_consumer, user_manager, sample_user_data
+):
+    """
+    Test that the user data dumps are only built when debug logging is enabled.
+    """
+    event_data = {
+        "name": "purchase_made",
+        "event_properties": '{"user_id": "test_user", "amount": 10.0}',
+    }
+    with patch.object(user_manager, "get_user", return_value=sample_user_data):
+        with patch.object(user_manager, "save_user"):
+            with patch.object(user_manager, "display_user_data") as mock_display:
+                stream_consumer.process_event("event_id_1", event_data)
+
+    mock_display.assert_not_called()
+
+
+def test_process_event_skips_rule_state_dumps_when_debug_disabled(
+    stream_consumer, user_manager, tripwire_manager, sample_user_data
+):
+    """
+    Test that an applied rule does not read every rule state just to log it.
+    """
+    event_data = {
+        "name": "scam_message_flagged",
+        "event_properties": '{"user_id": "test_user"}',
+    }
+    rule = MagicMock()
+    rule.process_rule.return_value = True
+    stream_consumer.rule_registry.get = MagicMock(return_value=rule)
+    tripwire_manager.apply_tripwire_if_needed = MagicMock()
+    tripwire_manager.get_disabled_rules = MagicMock()
+    with patch.object(user_manager, "get_user", return_value=sample_user_data):
+        with patch.object(user_manager, "save_user"):
+            stream_consumer.process_event("event_id_1", event_data)
+
+    tripwire_manager.apply_tripwire_if_needed.assert_called_once()
+    tripwire_manager.get_disabled_rules.assert_not_called()
+
+
+def test_process_event_saves_user_when_rule_fails(
+    stream_consumer, user_manager, sample_user_data
+):
+    """
+    Test that the handler's update is saved even when a rule raises.
+    """
+    event_data = {
+        "name": "scam_message_flagged",
+        "event_properties": '{"user_id": "test_user"}',
+    }
+    rule = MagicMock()
+    rule.process_rule.side_effect = RuntimeError("rule failed")
+    stream_consumer.rule_registry.get = MagicMock(return_value=rule)
+    with patch.object(user_manager, "get_user", return_value=sample_user_data):
+        with patch.object(user_manager, "save_user") as mock_save_user:
+            stream_consumer.process_event("event_id_1", event_data)
+
+    rule.process_rule.assert_called_once_with(sample_user_data)
+    mock_save_user.assert_called_once_with(sample_user_data)
+
+
 def test_start_reads_and_processes_events(stream_consumer, mock_redis):
     mock_redis["stream"].xreadgroup.return_value = [
         ("test_event_stream", [("event_id_1", {"name": "test_event"})])
@@ -1,43 +1,143 @@
-import time
-from unittest.mock import MagicMock
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from feature_restriction.tripwire_manager import APPLY_TRIPWIRE_SCRIPT
 
 
 def test_is_rule_disabled_via_tripwire(tripwire_manager, mock_redis):
     """
     Test the is_rule_disabled_via_tripwire method.
     """
-    mock_redis["tripwire"].hget.return_value = "1"
+    mock_redis["tripwire"].hgetall.return_value = {"test_rule": "1"}
     assert tripwire_manager.is_rule_disabled_via_tripwire("test_rule") is True
-    mock_redis["tripwire"].hget.assert_called_with("tripwire:states", "test_rule")
+    mock_redis["tripwire"].hgetall.assert_called_with("tripwire:states")
+
+    tripwire_manager.invalidate_states_cache()
+    mock_redis["tripwire"].hgetall.return_value = {"test_rule": "0"}
+    assert tripwire_manager.is_rule_disabled_via_tripwire("test_rule") is False
+    mock_redis["tripwire"].hget.assert_not_called()
+
+
+def test_is_rule_disabled_via_tripwire_uses_cached_states(tripwire_manager, mock_redis):
+    """
+    Test that rule checks within the TTL share a single HGETALL of the states hash.
+    """
+    mock_redis["tripwire"].hgetall.return_value = {"rule_a": "1", "rule_b": "0"}
+
+    with patch(
+        "feature_restriction.tripwire_manager.time.monotonic", return_value=100.0
+    ):
+        assert tripwire_manager.is_rule_disabled_via_tripwire("rule_a") is True
+        assert tripwire_manager.is_rule_disabled_via_tripwire("rule_b") is False
+        assert tripwire_manager.is_rule_disabled_via_tripwire("rule_c") is False
+    mock_redis["tripwire"].hgetall.assert_called_once_with("tripwire:states")
+
+    # Once the TTL has passed the states are read again
+    with patch(
+        "feature_restriction.tripwire_manager.time.monotonic", return_value=101.0
+    ):
+        tripwire_manager.is_rule_disabled_via_tripwire("rule_a")
+    assert mock_redis["tripwire"].hgetall.call_count == 2
 
-    mock_redis["tripwire"].hget.return_value = "0"
+
+def test_apply_tripwire_state_change_invalidates_cache(tripwire_manager, mock_redis):
+    """
+    Test that a state change made through the manager is visible to the next rule check.
+    """
+    mock_redis["tripwire"].hgetall.return_value = {}
     assert tripwire_manager.is_rule_disabled_via_tripwire("test_rule") is False
 
+    # The script reports the rule going from enabled to disabled
+    mock_redis["tripwire"].register_script.return_value.return_value = [0, 1, 1]
+    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_1", 10)
+
+    mock_redis["tripwire"].hgetall.return_value = {"test_rule": "1"}
+    assert tripwire_manager.is_rule_disabled_via_tripwire("test_rule") is True
+
 
 def test_apply_tripwire_if_needed(tripwire_manager, mock_redis):
     """
     Test the apply_tripwire_if_needed method.
     """
-    # Mock Redis responses for affected users and count
-    current_time = time.time()
-    mock_redis["tripwire"].hgetall.return_value = {"user_1": str(current_time - 100)}
-    mock_redis["tripwire"].hlen.return_value = 1
+    # Mock the script result: rule was enabled, is now disabled, 1 affected user
+    apply_script = mock_redis["tripwire"].register_script.return_value
+    apply_script.return_value = [0, 1, 1]
 
     # Adjust the threshold
     tripwire_manager.threshold = 0.1  # 10%
 
     # Act: Apply the tripwire
+    with patch("feature_restriction.tripwire_manager.time.time", return_value=1000.0):
+        tripwire_manager.apply_tripwire_if_needed("test_rule", "user_2", 10)
+
+    # Validate the single script call with the correct keys and arguments
+    apply_script.assert_called_once_with(
+        keys=["tripwire:affected_users:test_rule", "tripwire:states"],
+        args=["test_rule", 1000.0, 300, 0.1, 10, "user_2"],
+    )
+    mock_redis["tripwire"].hset.assert_not_called()
+
+
+def test_apply_tripwire_bulk(tripwire_manager, mock_redis):
+    """
+    Test that apply_tripwire_bulk records all users in a single script call.
+    """
+    apply_script = mock_redis["tripwire"].register_script.return_value
+    apply_script.return_value = [0, 1, 3]
+
+    with patch("feature_restriction.tripwire_manager.time.time", return_value=1000.0):
+        tripwire_manager.apply_tripwire_bulk(
+            "test_rule", ["user_1", "user_2", "user_3"], 10
+        )
+
+    apply_script.assert_called_once_with(
+        keys=["tripwire:affected_users:test_rule", "tripwire:states"],
+        args=["test_rule", 1000.0, 300, 0.05, 10, "user_1", "user_2", "user_3"],
+    )
+
+
+def test_affected_users_key_is_cached(tripwire_manager, mock_redis):
+    """
+    Test that the affected users key of a rule is built once and reused afterwards.
+    """
+    apply_script = mock_redis["tripwire"].register_script.return_value
+    apply_script.return_value = [0, 0, 1]
+
+    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_1", 10)
     tripwire_manager.apply_tripwire_if_needed("test_rule", "user_2", 10)
 
-    # Validate calls to hset and hgetall
-    affected_users_key = "tripwire:affected_users:test_rule"
-    assert any(
-        call.args[0] == affected_users_key and call.args[1] == "user_2"
-        for call in mock_redis["tripwire"].hset.call_args_list
-    ), "Expected hset call with correct arguments not found."
+    assert tripwire_manager.affected_users_keys == {
+        "test_rule": "tripwire:affected_users:test_rule"
+    }
+    first_key, second_key = (
+        call.kwargs["keys"][0] for call in apply_script.call_args_list
+    )
+    assert first_key is second_key
+
 
-    # Validate tripwire state update
-    mock_redis["tripwire"].hset.assert_any_call("tripwire:states", "test_rule", "1")
+def test_apply_tripwire_bulk_empty(tripwire_manager, mock_redis):
+    """
+    Test that apply_tripwire_bulk rejects an empty list of users.
+    """
+    with pytest.raises(ValueError, match="At least one user ID is required."):
+        tripwire_manager.apply_tripwire_bulk("test_rule", [], 10)
+
+    mock_redis["tripwire"].register_script.return_value.assert_not_called()
+
+
+def test_apply_tripwire_script_registered(tripwire_manager, mock_redis):
+    """
+    Test that the tripwire Lua script is registered once when the manager is created.
+    """
+    mock_redis["tripwire"].register_script.assert_called_once_with(
+        APPLY_TRIPWIRE_SCRIPT
+    )
+    assert (
+        tripwire_manager.apply_tripwire_script
+        == mock_redis["tripwire"].register_script.return_value
+    )
 
 
 def test_get_disabled_rules(tripwire_manager, mock_redis):
@@ -53,84 +153,55 @@ def test_get_disabled_rules(tripwire_manager, mock_redis):
     mock_redis["tripwire"].hgetall.assert_called_with("tripwire:states")
 
 
-def test_apply_tripwire_if_needed_no_expired_users(tripwire_manager, mock_redis):
+def test_apply_tripwire_if_needed_logs_tripwire_thrown(
+    tripwire_manager, mock_redis, caplog
+):
     """
-    Test apply_tripwire_if_needed when there are no expired users.
-    Ensures no hdel call occurs for expired users.
+    Test apply_tripwire_if_needed logs when the script reports the rule became disabled.
     """
-    current_time = time.time()
-    # Existing user still within the time window
-    mock_redis["tripwire"].hgetall.return_value = {"user_1": str(current_time - 100)}
-    mock_redis["tripwire"].hlen.return_value = 2  # 2 affected users
-    mock_redis["tripwire"].hget.return_value = "0"  # rule currently enabled
-    tripwire_manager.threshold = 0.5  # 50%
+    mock_redis["tripwire"].register_script.return_value.return_value = [0, 1, 6]
 
-    # With total_users = 10 and 2 affected, percentage = 20%, below threshold
-    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_2", 10)
+    with caplog.at_level(logging.INFO):
+        tripwire_manager.apply_tripwire_if_needed("test_rule", "user_1", 100)
 
-    mock_redis["tripwire"].hgetall.assert_called_once()
-    # No expired users removed
-    mock_redis["tripwire"].hdel.assert_not_called()
-    # Since 20% < 50%, rule stays enabled
-    mock_redis["tripwire"].hset.assert_any_call("tripwire:states", "test_rule", "0")
+    assert "Tripwire thrown: Rule 'test_rule' disabled: 6/100" in caplog.text
 
 
-def test_apply_tripwire_if_needed_reenable_rule(tripwire_manager, mock_redis):
+def test_apply_tripwire_if_needed_reenable_rule(tripwire_manager, mock_redis, caplog):
     """
     Test apply_tripwire_if_needed scenario where the rule was previously disabled
     but now conditions improve (percentage drops below threshold) and the rule is re-enabled.
     """
-    current_time = time.time()
-    # Users still within time window
-    mock_redis["tripwire"].hgetall.return_value = {"user_1": str(current_time - 50)}
-    mock_redis["tripwire"].hlen.return_value = 1  # 1 affected user
-    # rule was previously disabled
-    mock_redis["tripwire"].hget.return_value = "1"
-    tripwire_manager.threshold = 0.5  # 50%
+    mock_redis["tripwire"].register_script.return_value.return_value = [1, 0, 1]
 
-    # With total_users = 10 and 1 affected, percentage = 10%, below threshold
-    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_2", 10)
+    with caplog.at_level(logging.INFO):
+        tripwire_manager.apply_tripwire_if_needed("test_rule", "user_2", 10)
 
-    # Rule should now be re-enabled since percentage < threshold
-    mock_redis["tripwire"].hset.assert_any_call("tripwire:states", "test_rule", "0")
+    assert "Tripwire disengaged: Rule 'test_rule' re-enabled: 1/10" in caplog.text
 
 
-def test_apply_tripwire_if_needed_zero_total_users(tripwire_manager, mock_redis):
+def test_apply_tripwire_if_needed_unchanged_state_not_logged(
+    tripwire_manager, mock_redis, caplog
+):
     """
-    Test apply_tripwire_if_needed with total_users=0 to ensure no division by zero error.
-    Percentage should be 0 if no users exist.
+    Test apply_tripwire_if_needed does not log a transition when the state is unchanged.
     """
-    current_time = time.time()
-    mock_redis["tripwire"].hgetall.return_value = {}
-    mock_redis["tripwire"].hlen.return_value = 1  # 1 affected user, but total_users=0
-    mock_redis["tripwire"].hget.return_value = "0"
-    tripwire_manager.threshold = 0.1
+    mock_redis["tripwire"].register_script.return_value.return_value = [0, 0, 2]
 
-    # total_users=0 implies percentage=0/0=0 by code logic
-    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_1", 0)
+    with caplog.at_level(logging.INFO):
+        tripwire_manager.apply_tripwire_if_needed("test_rule", "user_2", 10)
 
-    # Should remain enabled since percentage=0
-    mock_redis["tripwire"].hset.assert_any_call("tripwire:states", "test_rule", "0")
+    assert "Tripwire" not in caplog.text
 
 
-def test_apply_tripwire_if_needed_expired_users_removed(tripwire_manager, mock_redis):
+def test_apply_tripwire_if_needed_zero_total_users(tripwire_manager, mock_redis):
     """
-    Test apply_tripwire_if_needed removes expired users correctly.
+    Test apply_tripwire_if_needed with total_users=0 to ensure no division by zero error.
+    The script treats the percentage as 0 if no users exist.
     """
-    current_time = time.time()
-    # user_1 is expired, user_2 is not
-    mock_redis["tripwire"].hgetall.return_value = {
-        "user_1": str(current_time - 1000),  # expired beyond time_window=300
-        "user_2": str(current_time - 100),
-    }
-    mock_redis["tripwire"].hlen.return_value = 2
-    mock_redis["tripwire"].hget.return_value = "0"
-    tripwire_manager.threshold = 0.5
+    apply_script = mock_redis["tripwire"].register_script.return_value
+    apply_script.return_value = [0, 0, 1]
 
-    # total_users=10 and after removing expired user_1, we have 2 affected (including user_3 just added)
-    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_3", 10)
+    tripwire_manager.apply_tripwire_if_needed("test_rule", "user_1", 0)
 
-    # Expired user_1 should be removed
-    mock_redis["tripwire"].hdel.assert_called_once_with(
-        "tripwire:affected_users:test_rule", "user_1"
-    )
+    assert apply_script.call_args.kwargs["args"][4] == 0
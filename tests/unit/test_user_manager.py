@@ -1,9 +1,9 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import call
 
 import pytest
-from fastapi import HTTPException
 
-from feature_restriction.models import UserData
+from feature_restriction.models import AccessFlag, UserData
+from feature_restriction.redis_user_manager import USER_SCAN_COUNT, RedisUserManager
 
 
 def test_get_user_existing(user_manager, mock_redis, sample_user_data):
@@ -14,7 +14,7 @@ def test_get_user_existing(user_manager, mock_redis, sample_user_data):
     user_data = user_manager.get_user("test_user")
     assert user_data.user_id == "test_user"
     assert user_data.scam_message_flags == 1
-    assert user_data.access_flags["can_message"]
+    assert AccessFlag.can_message in user_data.access_flags
 
 
 def test_get_user_nonexistent(user_manager, mock_redis):
@@ -42,7 +42,9 @@ def test_create_user(user_manager, mock_redis):
     mock_redis["user"].set.return_value = True
     user_data = user_manager.create_user("new_user")
     assert user_data.user_id == "new_user"
-    mock_redis["user"].set.assert_called_once_with("new_user", user_data.json())
+    mock_redis["user"].set.assert_called_once_with(
+        "new_user", RedisUserManager._serialize_user(user_data)
+    )
 
 
 def test_create_user_exception(user_manager, mock_redis):
@@ -54,16 +56,53 @@ def test_create_user_exception(user_manager, mock_redis):
         user_manager.create_user("failing_user")
 
 
+def test_bulk_create(user_manager, mock_redis):
+    """
+    Test creating several users with a single MSET.
+    """
+    users = user_manager.bulk_create(["user_1", "user_2"])
+    assert [user.user_id for user in users] == ["user_1", "user_2"]
+    mock_redis["user"].mset.assert_called_once_with(
+        {user.user_id: RedisUserManager._serialize_user(user) for user in users}
+    )
+    mock_redis["user"].set.assert_not_called()
+
+
+def test_bulk_create_empty(user_manager, mock_redis):
+    """
+    Test bulk_create with no user IDs does not touch Redis.
+    """
+    assert user_manager.bulk_create([]) == []
+    mock_redis["user"].mset.assert_not_called()
+
+
+def test_bulk_create_exception(user_manager, mock_redis):
+    """
+    Test bulk_create raises an exception if writing the users fails.
+    """
+    mock_redis["user"].mset.side_effect = Exception("Redis mset error")
+    with pytest.raises(Exception, match="Redis mset error"):
+        user_manager.bulk_create(["user_1"])
+
+
 def test_save_user(user_manager, mock_redis, sample_user_data):
     """
     Test saving user data to Redis.
     """
     user_manager.save_user(sample_user_data)
     mock_redis["user"].set.assert_called_once_with(
-        sample_user_data.user_id, sample_user_data.json()
+        sample_user_data.user_id, RedisUserManager._serialize_user(sample_user_data)
     )
 
 
+def test_serialize_user_round_trip(sample_user_data):
+    """
+    Test that the stored JSON value reads back as the same user.
+    """
+    serialized = RedisUserManager._serialize_user(sample_user_data)
+    assert UserData.model_validate_json(serialized) == sample_user_data
+
+
 def test_save_user_exception(user_manager, mock_redis, sample_user_data):
     """
     Test save_user raises an exception if redis set fails.
@@ -95,37 +134,51 @@ def test_get_user_count(user_manager, mock_redis):
     """
     Test counting the number of users in Redis.
     """
-    mock_redis["user"].keys.return_value = ["user1", "user2", "user3"]
+    mock_redis["user"].dbsize.return_value = 3
     count = user_manager.get_user_count()
     assert count == 3
-    mock_redis["user"].keys.assert_called_once_with("*")
+    mock_redis["user"].dbsize.assert_called_once_with()
 
 
 def test_get_user_count_exception(user_manager, mock_redis):
     """
-    Test get_user_count returns 0 and logs error if redis keys fail.
+    Test get_user_count returns 0 and logs error if redis dbsize fails.
     """
-    mock_redis["user"].keys.side_effect = Exception("Redis keys error")
+    mock_redis["user"].dbsize.side_effect = Exception("Redis dbsize error")
     count = user_manager.get_user_count()
     assert count == 0
-    mock_redis["user"].keys.assert_called_once_with("*")
+    mock_redis["user"].dbsize.assert_called_once_with()
 
 
 def test_clear_all_users(user_manager, mock_redis):
     """
     Test clearing all user data from Redis.
     """
-    mock_redis["user"].keys.return_value = ["user1", "user2"]
+    mock_redis["user"].scan_iter.return_value = ["user1", "user2"]
     mock_redis["user"].delete.return_value = 2
     user_manager.clear_all_users()
+    mock_redis["user"].scan_iter.assert_called_once_with(count=1000)
     mock_redis["user"].delete.assert_called_once_with("user1", "user2")
 
 
+def test_clear_all_users_deletes_in_batches(user_manager, mock_redis):
+    """
+    Test that clearing many users issues one DEL per batch of scanned keys.
+    """
+    keys = [f"user{i}" for i in range(USER_SCAN_COUNT + 1)]
+    mock_redis["user"].scan_iter.return_value = iter(keys)
+    user_manager.clear_all_users()
+    assert mock_redis["user"].delete.call_args_list == [
+        call(*keys[:USER_SCAN_COUNT]),
+        call(keys[USER_SCAN_COUNT]),
+    ]
+
+
 def test_clear_all_users_no_keys(user_manager, mock_redis):
     """
     Test clearing all user data when there are no keys in Redis.
     """
-    mock_redis["user"].keys.return_value = []
+    mock_redis["user"].scan_iter.return_value = []
     user_manager.clear_all_users()
     # delete not called since no keys
     mock_redis["user"].delete.assert_not_called()
@@ -135,7 +188,7 @@ def test_clear_all_users_exception(user_manager, mock_redis):
     """
     Test clear_all_users raises an exception if redis delete fails.
     """
-    mock_redis["user"].keys.return_value = ["user1", "user2"]
+    mock_redis["user"].scan_iter.return_value = ["user1", "user2"]
     mock_redis["user"].delete.side_effect = Exception("Redis delete error")
     with pytest.raises(Exception, match="Redis delete error"):
         user_manager.clear_all_users()